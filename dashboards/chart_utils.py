@@ -0,0 +1,115 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# ========================================
+# CHART HELPERS
+# ========================================
+# Shared helpers for the Plotly charts on every dashboard page
+
+# Above this many points a line chart gets downsampled before sending
+MAX_LINE_POINTS = 500
+
+# Markers only help readability on short series
+MAX_MARKER_POINTS = 200
+
+
+def lttb(x, y, n_out: int = MAX_LINE_POINTS):
+    """
+    Downsample a line to n_out points with Largest-Triangle-Three-Buckets.
+
+    WHY LTTB?
+    Every point is serialized to JSON and sent to the browser. Taking
+    every k-th point would hide spikes; LTTB keeps the point in each
+    bucket that forms the largest triangle with its neighbours, so peaks
+    and dips survive.
+
+    Args:
+        x: X values (numbers or datetimes), sorted ascending
+        y: Y values
+        n_out: Number of points to keep
+
+    Returns:
+        (x, y) arrays with at most n_out points
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return x, y
+
+    # Work on numeric x (datetimes as nanoseconds)
+    if np.issubdtype(x.dtype, np.datetime64):
+        xs = x.astype('datetime64[ns]').astype(np.int64).astype(float)
+    else:
+        xs = x.astype(float)
+
+    # First and last points are always kept; the rest is split in buckets
+    bucket_size = (n - 2) / (n_out - 2)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+
+    a = 0  # Index of the previously selected point
+    for i in range(n_out - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+
+        # Third triangle corner: average of the next bucket
+        avg_x = xs[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        area = np.abs(
+            (xs[a] - avg_x) * (y[start:end] - y[a])
+            - (xs[a] - xs[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+
+    return x[keep], y[keep]
+
+
+def line_mode(n_points: int) -> str:
+    """Plotly trace mode: draw markers only for short series."""
+    return 'lines+markers' if n_points <= MAX_MARKER_POINTS else 'lines'
+
+
+# ========================================
+# FIGURE CACHING
+# ========================================
+
+# Same lifetime as the query caches in db_connector
+FIGURE_CACHE_TTL = 300
+
+
+def _df_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Cache key for a DataFrame: a digest of every cell, the index and the columns.
+
+    WHY NOT JUST THE SHAPE AND EDGE ROWS?
+    Two results can share both and differ in the middle (same days, new
+    numbers), which would serve a stale figure. hash_pandas_object hashes
+    all rows vectorised - microseconds for the few thousand rows a chart gets.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((tuple(df.columns), tuple(map(str, df.dtypes)))).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+def cache_figure(build_fig):
+    """
+    Cache a function that turns DataFrames into a Plotly figure.
+
+    WHY?
+    Streamlit reruns the whole page on every click. Building a figure
+    walks the data and creates the full Plotly spec each time; with this
+    decorator an unchanged input returns the already-built figure.
+    """
+    return st.cache_data(
+        ttl=FIGURE_CACHE_TTL,
+        show_spinner=False,
+        hash_funcs={pd.DataFrame: _df_fingerprint}
+    )(build_fig)
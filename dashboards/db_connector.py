@@ -1,12 +1,82 @@
-import psycopg2
+from psycopg2 import errors, pool
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+from cachelib import FileSystemCache
+import io
+import os
+import re
+import hashlib
+import tempfile
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from typing import Optional
 import streamlit as st
+import threading
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Low-cardinality dimension columns stored as pandas 'category'
+# (small integer codes instead of one Python string per row)
+CATEGORICAL_COLS = {'device_type', 'country_code', 'network_type'}
+
+
+# Parts of a SQL text that can hold a ';' without ending the statement:
+# -- and /* */ comments, 'string' literals, "quoted" names, $$dollar$$ quotes
+SQL_NON_CODE = re.compile(
+    r"--[^\n]*|/\*.*?\*/|'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\$(\w*)\$.*?\$\1\$",
+    re.DOTALL
+)
+
+# A final ';', plus any whitespace or comments after it
+TRAILING_SEMICOLON = re.compile(r";(?:\s|--[^\n]*|/\*.*?\*/)*\Z", re.DOTALL)
+
+
+def _is_single_statement(sql: str) -> bool:
+    """
+    True when sql is one statement (a trailing ';' is fine).
+
+    A ';' inside a comment, literal or quoted name doesn't count.
+    """
+    code = SQL_NON_CODE.sub(' ', sql)
+    return ';' not in code.strip().rstrip(';')
+
+
+def _finish_frame(df: pd.DataFrame, parse_dates: Optional[list] = None) -> pd.DataFrame:
+    """
+    Apply the dtype fixes every query result gets.
+
+    WHY CATEGORY?
+    device_type/country_code/network_type repeat a handful of values.
+    As categories, groupby/pivot hash small integer codes instead of
+    strings, and the frame (and every cached copy of it) is smaller.
+    """
+    for col in parse_dates or []:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col])
+    for col in CATEGORICAL_COLS.intersection(df.columns):
+        df[col] = df[col].astype('category')
+    return df
+
+
+def data_endpoint(parse_dates: Optional[list] = None):
+    """
+    Turn a method that builds (sql, params) into one that runs it.
+
+    WHY?
+    Each endpoint only BUILDS its query; running it (and parsing its
+    date columns) happens in one place.
+    """
+    def decorator(build_sql):
+        @functools.wraps(build_sql)
+        def run(self, *args, **kwargs):
+            sql, params = build_sql(self, *args, **kwargs)
+            return self.query(sql, params, parse_dates=parse_dates)
+        return run
+    return decorator
+
 
 class WarehouseDataConnector:
     """
@@ -18,36 +88,102 @@ class WarehouseDataConnector:
     - Consistent error handling
     """
 
-    def __init__(self, host="localhost", port=5433,
+    def __init__(self, host=None, port=None,
                  database="streaming_analytics", user="analytics_user",
-                 password="analytics_password"):
-        """Initialize database connection parameters."""
+                 password="analytics_password", minconn=3, maxconn=10):
+        """
+        Initialize database connection parameters.
+
+        Host/port default to PGHOST/PGPORT, so the dashboards can use the
+        Unix socket (e.g. PGHOST=/var/run/postgresql) when running next
+        to the database.
+        """
+        host = host or os.environ.get('PGHOST', 'localhost')
+        port = port or int(os.environ.get('PGPORT', 5433))
+
         self.connection_params = {
             'host': host,
             'port': port,
             'database': database,
             'user': user,
-            'password': password
+            'password': password,
+
+            # Guard rails for every pooled connection:
+            # - statement_timeout: a runaway query is cancelled after 10s
+            #   instead of holding a pool slot other users are waiting for
+            # - work_mem: enough memory for sorts/hashes to stay off disk
+            'options': '-c statement_timeout=10000 -c work_mem=64MB'
         }
-        self.conn = None
+
+        # Local connections never leave the machine: skip the SSL
+        # negotiation round trip libpq would otherwise attempt first
+        if host.startswith('/') or host in ('localhost', '127.0.0.1', '::1'):
+            self.connection_params['sslmode'] = 'disable'
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self._pool = None
+
+        # The connector is shared by every Streamlit session (see
+        # get_db_connector below), so pool creation must be thread-safe
+        self._pool_lock = threading.Lock()
 
     def connect(self):
-        """Establish database connection."""
-        try:
-            self.conn = psycopg2.connect(**self.connection_params)
-            logger.info("✅ Connected to database")
-            return self.conn
-        except Exception as e:
-            logger.error(f"❌ Database connection failed: {e}")
-            raise
+        """
+        Create the connection pool (only once).
+
+        WHY A POOL?
+        Opening a connection costs a TCP handshake + authentication.
+        A pool keeps connections open and lends them out per query, so
+        several dashboard sessions can query at the same time.
+        """
+        with self._pool_lock:
+            if self._pool is None or self._pool.closed:
+                try:
+                    self._pool = pool.ThreadedConnectionPool(
+                        self.minconn, self.maxconn, **self.connection_params
+                    )
+                    logger.info("✅ Connected to database (pool of up to %d connections)", self.maxconn)
+                except Exception as e:
+                    logger.error("❌ Database connection failed: %s", e)
+                    raise
+        return self._pool
 
     def close(self):
-        """Close database connection."""
-        if self.conn:
-            self.conn.close()
-            logger.info("🔌 Database connection closed")
+        """Close all pooled database connections."""
+        if self._pool and not self._pool.closed:
+            self._pool.closeall()
+            logger.info("🔌 Database connection pool closed")
+
+    def warm_pool(self):
+        """
+        Check out every idle pooled connection at once and ping it.
 
-    def query(self, sql: str, params: Optional[tuple] = None) -> pd.DataFrame:
+        WHY: The first visitor shouldn't pay for connection setup or a
+        stale connection; this runs in the background at startup.
+        """
+        conn_pool = self.connect()
+        conns = [conn_pool.getconn() for _ in range(self.minconn)]
+        try:
+            for conn in conns:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+        finally:
+            for conn in conns:
+                conn_pool.putconn(conn)
+        logger.info("🔥 Warmed %d pooled connections", len(conns))
+
+    @contextmanager
+    def _checkout(self):
+        """Borrow a connection from the pool and always give it back."""
+        conn_pool = self.connect()
+        conn = conn_pool.getconn()
+        try:
+            yield conn
+        finally:
+            conn_pool.putconn(conn)
+
+    def query(self, sql: str, params: Optional[tuple] = None,
+              parse_dates: Optional[list] = None) -> pd.DataFrame:
         """
         Execute SQL query and return results as DataFrame.
 
@@ -59,21 +195,109 @@ class WarehouseDataConnector:
         Args:
             sql: SQL query string
             params: Optional parameters for parameterized queries
+            parse_dates: Optional columns to parse as datetimes
 
         Returns:
             pandas DataFrame with query results
         """
         try:
-            if not self.conn or self.conn.closed:
-                self.connect()
-
-            df = pd.read_sql_query(sql, self.conn, params=params)
-            logger.info(f"✅ Query returned {len(df)} rows")
+            with self._checkout() as conn:
+                # COPY can only wrap a single SELECT
+                if not _is_single_statement(sql):
+                    df = self._cursor_query(conn, sql, params)
+                else:
+                    table = self._arrow_query(conn, TRAILING_SEMICOLON.sub('', sql), params)
+                    df = table.to_pandas(date_as_object=False)
+
+            df = _finish_frame(df, parse_dates)
+            logger.info("✅ Query returned %d rows", len(df))
             return df
 
         except Exception as e:
-            logger.error(f"❌ Query failed: {e}")
-            logger.error(f"SQL: {sql}")
+            logger.error("❌ Query failed: %s", e)
+            logger.error("SQL: %s", sql)
+            raise
+
+    def _arrow_query(self, conn, sql: str, params: Optional[tuple]) -> pa.Table:
+        """
+        Stream a query result with COPY ... TO STDOUT into an Arrow table.
+
+        WHY COPY + ARROW?
+        A normal cursor creates a Python object for every cell before pandas
+        ever sees it. COPY sends the whole result as one CSV stream, and
+        Arrow's multithreaded reader builds typed columns from it directly
+        (dates, timestamps and booleans included).
+        """
+        buf = io.BytesIO()
+        with conn.cursor() as cur:
+            # COPY can't take bind parameters, so substitute them first
+            statement = cur.mogrify(sql, params).decode()
+            # On its own lines, so a trailing -- comment can't swallow the ')'
+            cur.copy_expert(f"COPY (\n{statement}\n) TO STDOUT WITH (FORMAT CSV, HEADER)", buf)
+        buf.seek(0)
+
+        # COPY writes booleans as t/f and NULL as an empty field
+        return pa_csv.read_csv(buf, convert_options=pa_csv.ConvertOptions(
+            true_values=['t'], false_values=['f'],
+            null_values=[''], strings_can_be_null=True
+        ))
+
+    def _cursor_query(self, conn, sql: str, params: Optional[tuple]) -> pd.DataFrame:
+        """
+        Fetch a query result through a plain cursor.
+
+        Used when COPY can't wrap the SQL. Building the DataFrame straight
+        from the fetched tuples skips pd.read_sql_query's extra layers.
+        """
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+            columns = [desc.name for desc in cur.description]
+
+        # coerce_float turns NUMERIC (Decimal) values into floats
+        return pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+
+    def query_many(self, jobs: dict, with_sql: Optional[str] = None) -> dict:
+        """
+        Run several SELECTs in ONE round trip.
+
+        WHY?
+        Every query normally pays a full request/response over the network.
+        Here each query becomes a json_agg() sub-select of a single
+        statement, so the server answers all of them at once.
+
+        Args:
+            jobs: {name: (sql, params, parse_dates)}
+            with_sql: Optional CTEs ("WITH ...") the queries can share
+
+        Returns:
+            {name: DataFrame}
+        """
+        try:
+            with self._checkout() as conn, conn.cursor() as cur:
+                statements = [cur.mogrify(sql, params).decode() for sql, params, _ in jobs.values()]
+                subqueries = [
+                    "(SELECT COALESCE(json_agg(q), '[]') FROM ({}) q)".format(statement)
+                    for statement in statements
+                ]
+                cur.execute((with_sql or "") + "\nSELECT " + ",\n".join(subqueries))
+                row = cur.fetchone()
+
+                results = {}
+                for (name, (_, _, parse_dates)), statement, records in zip(jobs.items(), statements, row):
+                    if records:
+                        df = pd.DataFrame(records)
+                    else:
+                        # An empty json_agg carries no column names: get them
+                        # from the same query with LIMIT 0 (only when empty)
+                        cur.execute(f"{with_sql or ''}\nSELECT * FROM ({statement}) q LIMIT 0")
+                        df = pd.DataFrame(columns=[col.name for col in cur.description])
+                    results[name] = _finish_frame(df, parse_dates)
+            logger.info("✅ Batched %d queries in one round trip", len(jobs))
+            return results
+
+        except Exception as e:
+            logger.error("❌ Batched query failed: %s", e)
             raise
 
     # ========================================
@@ -81,7 +305,9 @@ class WarehouseDataConnector:
     # ========================================
     # These methods fetch specific data for dashboards
     # Think of them as "data endpoints"
+    # Each one only BUILDS its (sql, params); @data_endpoint runs it
 
+    @data_endpoint()
     def get_overall_health(self) -> pd.DataFrame:
         """
         Get overall QoE health metrics.
@@ -99,12 +325,13 @@ class WarehouseDataConnector:
                 AVG(overall_qoe_score) as avg_qoe_score,
                 AVG(startup_time_ms) as avg_startup_ms,
                 AVG(rebuffer_ratio) as avg_rebuffer_pct,
-                SUM(CASE WHEN session_quality = 'poor' THEN 1 ELSE 0 END)::FLOAT / COUNT(*) * 100 as pct_poor_quality
-            FROM fact_playback_sessions
+                100.0 * COUNT(*) FILTER (WHERE session_quality = 'poor') / NULLIF(COUNT(*), 0) as pct_poor_quality
+            FROM mv_fact_sessions_wide
             WHERE session_timestamp >= NOW() - INTERVAL '48 hours'
         """
-        return self.query(query)
+        return query, None
 
+    @data_endpoint(parse_dates=['date'])
     def get_daily_trend(self, days: int = 30) -> pd.DataFrame:
         """
         Get daily QoE trend for last N days.
@@ -116,83 +343,96 @@ class WarehouseDataConnector:
         - avg_qoe_score
         - avg_startup_ms
         """
+        # Reads the hourly rollup: ~24 rows per day instead of every session
         query = """
             SELECT
-                d.full_date as date,
-                d.day_name,
-                COUNT(*) as sessions,
-                AVG(f.overall_qoe_score) as avg_qoe_score,
-                AVG(f.startup_time_ms) as avg_startup_ms,
-                AVG(f.rebuffer_ratio) as avg_rebuffer_pct,
-                SUM(CASE WHEN f.session_quality = 'poor' THEN 1 ELSE 0 END)::FLOAT / COUNT(*) * 100 as pct_poor
-            FROM fact_playback_sessions f
-            JOIN dim_date d ON f.date_key = d.date_key
-            WHERE d.full_date >= CURRENT_DATE - INTERVAL '%s days'
-            GROUP BY d.full_date, d.day_name
-            ORDER BY d.full_date
+                hour::date as date,
+                TO_CHAR(hour::date, 'FMDay') as day_name,
+                SUM(sessions) as sessions,
+                SUM(sum_qoe) / SUM(sessions) as avg_qoe_score,
+                SUM(sum_startup_ms)::FLOAT / SUM(sessions) as avg_startup_ms,
+                SUM(sum_rebuffer_ratio) / SUM(sessions) as avg_rebuffer_pct,
+                100.0 * SUM(poor_sessions) / NULLIF(SUM(sessions), 0) as pct_poor
+            FROM fact_hourly_rollup
+            WHERE hour >= CURRENT_DATE - make_interval(days => %s)
+            GROUP BY hour::date
+            ORDER BY hour::date
         """
-        return self.query(query, (days,))
+        return query, (days,)
 
-    def get_device_breakdown(self) -> pd.DataFrame:
+    @data_endpoint()
+    def get_device_breakdown(self, limit: Optional[int] = None) -> pd.DataFrame:
         """
         Get quality metrics by device type.
+
+        Args:
+            limit: Keep only the top N by sessions (None = all)
         """
         query = """
             SELECT
-                dev.device_type,
-                dev.device_family,
+                device_type,
+                device_family,
                 COUNT(*) as sessions,
-                AVG(f.overall_qoe_score) as avg_qoe_score,
-                AVG(f.startup_time_ms) as avg_startup_ms,
-                PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY f.startup_time_ms) as p95_startup_ms,
-                AVG(f.rebuffer_count) as avg_rebuffer_count
-            FROM fact_playback_sessions f
-            JOIN dim_device dev ON f.device_key = dev.device_key
-            WHERE f.session_timestamp >= NOW() - INTERVAL '7 days'
-            GROUP BY dev.device_type, dev.device_family
+                AVG(overall_qoe_score) as avg_qoe_score,
+                AVG(startup_time_ms) as avg_startup_ms,
+                -- percentile_disc picks an actual value: no interpolation step
+                PERCENTILE_DISC(0.95) WITHIN GROUP (ORDER BY startup_time_ms) as p95_startup_ms,
+                AVG(rebuffer_count) as avg_rebuffer_count
+            FROM mv_fact_sessions_wide
+            WHERE session_timestamp >= NOW() - INTERVAL '7 days'
+            GROUP BY device_type, device_family
             ORDER BY sessions DESC
+            LIMIT %s
         """
-        return self.query(query)
+        # LIMIT NULL means "no limit" in PostgreSQL
+        return query, (limit,)
 
-    def get_geographic_breakdown(self) -> pd.DataFrame:
+    @data_endpoint()
+    def get_geographic_breakdown(self, limit: Optional[int] = None) -> pd.DataFrame:
         """
         Get quality metrics by country.
+
+        Args:
+            limit: Keep only the top N by sessions (None = all)
         """
         query = """
             SELECT
-                g.country_code,
-                g.region,
+                country_code,
+                region,
                 COUNT(*) as sessions,
-                AVG(f.overall_qoe_score) as avg_qoe_score,
-                AVG(f.startup_time_ms) as avg_startup_ms,
-                SUM(CASE WHEN f.session_quality = 'poor' THEN 1 ELSE 0 END)::FLOAT / COUNT(*) * 100 as pct_poor
-            FROM fact_playback_sessions f
-            JOIN dim_geography g ON f.geo_key = g.geo_key
-            WHERE f.session_timestamp >= NOW() - INTERVAL '7 days'
-            GROUP BY g.country_code, g.region
+                AVG(overall_qoe_score) as avg_qoe_score,
+                AVG(startup_time_ms) as avg_startup_ms,
+                100.0 * COUNT(*) FILTER (WHERE session_quality = 'poor') / NULLIF(COUNT(*), 0) as pct_poor
+            FROM mv_fact_sessions_wide
+            WHERE session_timestamp >= NOW() - INTERVAL '7 days'
+            GROUP BY country_code, region
             HAVING COUNT(*) >= 10
             ORDER BY sessions DESC
+            LIMIT %s
         """
-        return self.query(query)
+        # LIMIT NULL means "no limit" in PostgreSQL
+        return query, (limit,)
 
+    @data_endpoint(parse_dates=['hour'])
     def get_hourly_trend(self, hours: int = 24) -> pd.DataFrame:
         """
         Get hourly QoE trend for last N hours.
         """
+        # Already bucketed by hour in the rollup table
         query = """
             SELECT
-                DATE_TRUNC('hour', session_timestamp) as hour,
-                COUNT(*) as sessions,
-                AVG(overall_qoe_score) as avg_qoe_score,
-                AVG(startup_time_ms) as avg_startup_ms,
-                AVG(rebuffer_ratio) as avg_rebuffer_pct
-            FROM fact_playback_sessions
-            WHERE session_timestamp >= NOW() - INTERVAL '%s hours'
-            GROUP BY DATE_TRUNC('hour', session_timestamp)
+                hour,
+                sessions,
+                sum_qoe / sessions as avg_qoe_score,
+                sum_startup_ms::FLOAT / sessions as avg_startup_ms,
+                sum_rebuffer_ratio / sessions as avg_rebuffer_pct
+            FROM fact_hourly_rollup
+            WHERE hour >= DATE_TRUNC('hour', NOW() - make_interval(hours => %s))
             ORDER BY hour
         """
-        return self.query(query, (hours,))
+        return query, (hours,)
 
+    @data_endpoint()
     def get_quality_distribution(self) -> pd.DataFrame:
         """
         Get session count by quality category.
@@ -201,7 +441,7 @@ class WarehouseDataConnector:
             SELECT
                 session_quality,
                 COUNT(*) as session_count
-            FROM fact_playback_sessions
+            FROM mv_fact_sessions_wide
             WHERE session_timestamp >= NOW() - INTERVAL '24 hours'
             GROUP BY session_quality
             ORDER BY
@@ -212,101 +452,433 @@ class WarehouseDataConnector:
                     WHEN 'poor' THEN 4
                 END
         """
-        return self.query(query)
+        return query, None
 
+    @data_endpoint()
     def get_top_issues(self, limit: int = 10) -> pd.DataFrame:
         """
         Get top quality issues in last 24 hours.
         """
         query = """
-            WITH poor_sessions AS (
-                SELECT
-                    f.*,
-                    dev.device_type,
-                    g.country_code
-                FROM fact_playback_sessions f
-                JOIN dim_device dev ON f.device_key = dev.device_key
-                JOIN dim_geography g ON f.geo_key = g.geo_key
-                WHERE f.session_quality = 'poor'
-                AND f.session_timestamp >= NOW() - INTERVAL '24 hours'
-            )
+            -- Each poor session is read ONCE, and LATERAL VALUES turns it into
+            -- one candidate row per issue type
             SELECT
-                'High Startup Time' as issue_type,
-                device_type,
-                country_code,
+                i.issue_type,
+                s.device_type,
+                s.country_code,
                 COUNT(*) as affected_sessions,
-                AVG(startup_time_ms)::INTEGER as avg_metric
-            FROM poor_sessions
-            WHERE startup_time_ms > 4000
-            GROUP BY device_type, country_code
-
-            UNION ALL
-
-            SELECT
-                'Excessive Buffering',
-                device_type,
-                country_code,
-                COUNT(*),
-                AVG(rebuffer_count)::INTEGER
-            FROM poor_sessions
-            WHERE rebuffer_count >= 3
-            GROUP BY device_type, country_code
-
+                AVG(i.metric)::INTEGER as avg_metric
+            FROM mv_fact_sessions_wide s
+            CROSS JOIN LATERAL (VALUES
+                ('High Startup Time', s.startup_time_ms > 4000, s.startup_time_ms),
+                ('Excessive Buffering', s.rebuffer_count >= 3, s.rebuffer_count)
+            ) AS i(issue_type, is_issue, metric)
+            WHERE s.session_quality = 'poor'
+            AND s.session_timestamp >= NOW() - INTERVAL '24 hours'
+            AND i.is_issue
+            GROUP BY i.issue_type, s.device_type, s.country_code
             ORDER BY affected_sessions DESC
             LIMIT %s
         """
-        return self.query(query, (limit,))
+        return query, (limit,)
 
+    @data_endpoint()
     def get_peak_time_analysis(self) -> pd.DataFrame:
         """
         Get quality by time of day.
         """
+        # Rollup hours are matched to dim_time's hour rows (time_key = HH00)
         query = """
             SELECT
                 t.hour,
                 t.time_of_day,
                 t.is_peak_time,
-                COUNT(*) as sessions,
-                AVG(f.overall_qoe_score) as avg_qoe_score,
-                AVG(f.startup_time_ms) as avg_startup_ms
-            FROM fact_playback_sessions f
-            JOIN dim_time t ON f.time_key = t.time_key
-            WHERE f.session_timestamp >= NOW() - INTERVAL '7 days'
+                SUM(r.sessions) as sessions,
+                SUM(r.sum_qoe) / SUM(r.sessions) as avg_qoe_score,
+                SUM(r.sum_startup_ms)::FLOAT / SUM(r.sessions) as avg_startup_ms
+            FROM fact_hourly_rollup r
+            JOIN dim_time t ON t.time_key = EXTRACT(HOUR FROM r.hour)::INTEGER * 100
+            WHERE r.hour >= NOW() - INTERVAL '7 days'
             GROUP BY t.hour, t.time_of_day, t.is_peak_time
             ORDER BY t.hour
         """
-        return self.query(query)
+        return query, None
+
+    def get_executive_bundle(self, issue_limit: int = 5, geo_limit: int = 10) -> dict:
+        """
+        Get every executive dashboard panel from ONE scan of the fact table.
+
+        WHY?
+        The separate get_* queries overlap (24h, 48h, 7d and 30d windows),
+        so PostgreSQL would read the same recent rows five times. Here the
+        last 30 days are read once into a shared CTE and every panel
+        aggregates from it.
+
+        RETURNS:
+        {'health', 'trend', 'quality_dist', 'geo', 'issues'} -> DataFrame
+        """
+        base = """
+            WITH base AS MATERIALIZED (
+                SELECT
+                    session_timestamp,
+                    full_date,
+                    day_name,
+                    device_type,
+                    country_code,
+                    region,
+                    overall_qoe_score,
+                    startup_time_ms,
+                    rebuffer_ratio,
+                    rebuffer_count,
+                    session_quality
+                FROM mv_fact_sessions_wide
+                WHERE session_timestamp >= CURRENT_DATE - INTERVAL '30 days'
+            )
+        """
+        health = """
+            SELECT
+                COUNT(*) as total_sessions,
+                AVG(overall_qoe_score) as avg_qoe_score,
+                AVG(startup_time_ms) as avg_startup_ms,
+                AVG(rebuffer_ratio) as avg_rebuffer_pct,
+                100.0 * COUNT(*) FILTER (WHERE session_quality = 'poor') / NULLIF(COUNT(*), 0) as pct_poor_quality
+            FROM base
+            WHERE session_timestamp >= NOW() - INTERVAL '48 hours'
+        """
+        trend = """
+            SELECT
+                full_date as date,
+                day_name,
+                COUNT(*) as sessions,
+                AVG(overall_qoe_score) as avg_qoe_score,
+                AVG(startup_time_ms) as avg_startup_ms,
+                AVG(rebuffer_ratio) as avg_rebuffer_pct,
+                100.0 * COUNT(*) FILTER (WHERE session_quality = 'poor') / NULLIF(COUNT(*), 0) as pct_poor
+            FROM base
+            GROUP BY full_date, day_name
+            ORDER BY full_date
+        """
+        quality_dist = """
+            SELECT
+                session_quality,
+                COUNT(*) as session_count
+            FROM base
+            WHERE session_timestamp >= NOW() - INTERVAL '24 hours'
+            GROUP BY session_quality
+            ORDER BY
+                CASE session_quality
+                    WHEN 'excellent' THEN 1
+                    WHEN 'good' THEN 2
+                    WHEN 'fair' THEN 3
+                    WHEN 'poor' THEN 4
+                END
+        """
+        geo = """
+            SELECT
+                country_code,
+                region,
+                COUNT(*) as sessions,
+                AVG(overall_qoe_score) as avg_qoe_score,
+                AVG(startup_time_ms) as avg_startup_ms,
+                100.0 * COUNT(*) FILTER (WHERE session_quality = 'poor') / NULLIF(COUNT(*), 0) as pct_poor
+            FROM base
+            WHERE session_timestamp >= NOW() - INTERVAL '7 days'
+            GROUP BY country_code, region
+            HAVING COUNT(*) >= 10
+            ORDER BY sessions DESC
+            LIMIT %s
+        """
+        issues = """
+            -- Each poor session is read ONCE, and LATERAL VALUES turns it into
+            -- one candidate row per issue type
+            SELECT
+                i.issue_type,
+                s.device_type,
+                s.country_code,
+                COUNT(*) as affected_sessions,
+                AVG(i.metric)::INTEGER as avg_metric
+            FROM base s
+            CROSS JOIN LATERAL (VALUES
+                ('High Startup Time', s.startup_time_ms > 4000, s.startup_time_ms),
+                ('Excessive Buffering', s.rebuffer_count >= 3, s.rebuffer_count)
+            ) AS i(issue_type, is_issue, metric)
+            WHERE s.session_quality = 'poor'
+            AND s.session_timestamp >= NOW() - INTERVAL '24 hours'
+            AND i.is_issue
+            GROUP BY i.issue_type, s.device_type, s.country_code
+            ORDER BY affected_sessions DESC
+            LIMIT %s
+        """
+        return self.query_many({
+            'health': (health, None, None),
+            'trend': (trend, None, ['date']),
+            'quality_dist': (quality_dist, None, None),
+            'geo': (geo, (geo_limit,), None),
+            'issues': (issues, (issue_limit,), None),
+        }, with_sql=base)
+
+    def get_geo_summary(self, top_n: int = 15, qoe_target: float = 85,
+                        below_limit: int = 20) -> dict:
+        """
+        Get both geographic panels of the engineering page in one round trip.
+
+        WHY?
+        The page used to download every country only to keep the top N
+        for the chart and filter/sort the rest for the "below target"
+        table. Both slices are now cut in PostgreSQL from one shared
+        per-country aggregate, so only the rendered rows are sent.
+
+        RETURNS:
+        {'top': top_n countries by sessions,
+         'below_target': countries under qoe_target, worst first}
+        """
+        base = """
+            WITH geo AS MATERIALIZED (
+                SELECT
+                    country_code,
+                    region,
+                    COUNT(*) as sessions,
+                    AVG(overall_qoe_score) as avg_qoe_score,
+                    AVG(startup_time_ms) as avg_startup_ms,
+                    100.0 * COUNT(*) FILTER (WHERE session_quality = 'poor') / NULLIF(COUNT(*), 0) as pct_poor
+                FROM mv_fact_sessions_wide
+                WHERE session_timestamp >= NOW() - INTERVAL '7 days'
+                GROUP BY country_code, region
+                HAVING COUNT(*) >= 10
+            )
+        """
+        top = """
+            SELECT country_code, sessions, avg_qoe_score, avg_startup_ms, pct_poor
+            FROM geo
+            ORDER BY sessions DESC
+            LIMIT %s
+        """
+        below_target = """
+            SELECT country_code, avg_qoe_score, pct_poor
+            FROM geo
+            WHERE avg_qoe_score < %s
+            ORDER BY avg_qoe_score
+            LIMIT %s
+        """
+        return self.query_many({
+            'top': (top, (top_n,), None),
+            'below_target': (below_target, (qoe_target, below_limit), None),
+        }, with_sql=base)
 
 # ========================================
 # STREAMLIT CACHING
 # ========================================
 # Cache database connections and queries for performance
 
+# One pool per workload (min, max connections)
+# WHY: Heavy ad-hoc analytics (percentiles, heatmaps, run_sql) must not
+# be able to take every connection away from the standard dashboard queries
+POOL_SIZES = {
+    'dashboard': (3, 10),
+    'analytics': (2, 6),
+}
+
+
 @st.cache_resource
-def get_db_connector():
+def get_db_connector(workload: str = 'dashboard'):
     """
-    Get database connector (cached for session).
+    Get database connector (cached for all sessions).
 
     WHY CACHE?
     Streamlit reruns the entire script on every interaction.
     Caching prevents reconnecting to DB every time!
+    The connector owns a connection pool shared by every session.
+
+    Args:
+        workload: 'dashboard' (query methods) or 'analytics' (run_sql)
     """
-    return WarehouseDataConnector()
+    minconn, maxconn = POOL_SIZES[workload]
+    db = WarehouseDataConnector(minconn=minconn, maxconn=maxconn)
+    db.connect()
+
+    # Warm up in the background so this call returns right away
+    if workload == 'dashboard':
+        threading.Thread(target=_warm_up, args=(db,), daemon=True).start()
+    return db
+
+
+# ========================================
+# SHARED RESULT CACHE
+# ========================================
+# st.cache_data lives inside ONE Streamlit process. When several processes
+# serve the dashboards, each one would miss and hit the database on its
+# own. This cache lives on disk, so all processes share one copy.
+
+SHARED_CACHE_DIR = os.environ.get(
+    'QOE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'qoe_dashboard_cache')
+)
+SHARED_CACHE_TTL = 300  # Same 5 minutes as st.cache_data
+
+
+# Stateless (just a directory), so one module-level instance is enough
+shared_cache = FileSystemCache(SHARED_CACHE_DIR, default_timeout=SHARED_CACHE_TTL)
+
+
+def _to_ipc(df: pd.DataFrame) -> bytes:
+    """Serialize a DataFrame as Arrow IPC (compact, version-independent)."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _from_ipc(blob: bytes) -> pd.DataFrame:
+    """Read a DataFrame back from Arrow IPC bytes."""
+    return pa.ipc.open_stream(blob).read_pandas()
+
+
+def clear_cache():
+    """Clear both the in-process and the shared cache (Refresh buttons)."""
+    st.cache_data.clear()
+    shared_cache.clear()
+
+
+TIMEOUT_WARNING = "⏱️ A query took too long and was cancelled. Try a shorter time range."
 
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
 def fetch_data(query_name: str, **kwargs):
     """
     Fetch data from database with caching.
 
+    A query cancelled by statement_timeout shows a warning and returns an
+    empty DataFrame (pages already handle "no data"). It happens outside
+    the cached function, so the empty result is never cached.
+
+    Args:
+        query_name: Name of query method (e.g., 'get_overall_health')
+        **kwargs: Arguments to pass to query method
+    """
+    try:
+        return _fetch_data_cached(query_name, **kwargs)
+    except errors.QueryCanceled:
+        st.warning(TIMEOUT_WARNING)
+        return pd.DataFrame()
+
+
+@st.cache_data(ttl=300)  # Cache for 5 minutes
+def _fetch_data_cached(query_name: str, **kwargs):
+    """
+    Cached part of fetch_data.
+
     WHY TTL (Time To Live)?
     Data changes over time, so we refresh cache every 5 minutes.
     This balances freshness vs. performance.
 
+    WHY TWO CACHES?
+    st.cache_data answers repeat calls inside this process; the shared
+    cache means only ONE process per 5 minutes actually queries PostgreSQL.
+    """
+    return _fetch_shared(get_db_connector(), query_name, kwargs)
+
+
+def _fetch_shared(db, query_name: str, kwargs: dict):
+    """Run a query method through the shared cache."""
+    key = hashlib.blake2b(
+        f"{query_name}:{sorted(kwargs.items())!r}".encode(), digest_size=16
+    ).hexdigest()
+
+    blob = shared_cache.get(key)
+    if blob is not None:
+        # Bundles (e.g. get_executive_bundle) are dicts of DataFrames
+        if isinstance(blob, dict):
+            return {name: _from_ipc(part) for name, part in blob.items()}
+        return _from_ipc(blob)
+
+    query_method = getattr(db, query_name)
+    result = query_method(**kwargs)
+
+    if isinstance(result, dict):
+        shared_cache.set(key, {name: _to_ipc(df) for name, df in result.items()})
+    else:
+        shared_cache.set(key, _to_ipc(result))
+    return result
+
+
+def fetch_data_concurrent(queries: dict) -> dict:
+    """
+    Fetch several independent queries AT THE SAME TIME.
+
+    WHY?
+    One after another, a page waits for the sum of all query times.
+    Running each on its own pooled connection, it waits only for the
+    slowest one.
+
     Args:
-        query_name: Name of query method (e.g., 'get_overall_health')
-        **kwargs: Arguments to pass to query method
+        queries: {query_name: kwargs}, e.g. {'get_hourly_trend': {'hours': 24}}
+
+    Returns:
+        {query_name: DataFrame}
     """
+    try:
+        return _fetch_concurrent_cached(queries)
+    except errors.QueryCanceled:
+        st.warning(TIMEOUT_WARNING)
+        return {query_name: pd.DataFrame() for query_name in queries}
+
+
+@st.cache_data(ttl=300)  # Cache for 5 minutes
+def _fetch_concurrent_cached(queries: dict) -> dict:
+    """Cached part of fetch_data_concurrent."""
     db = get_db_connector()
-    query_method = getattr(db, query_name)
-    return query_method(**kwargs)
\ No newline at end of file
+
+    # Worker threads go straight to the shared cache / database:
+    # st.cache_data itself must only be called from the script thread
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        futures = {
+            query_name: executor.submit(_fetch_shared, db, query_name, kwargs)
+            for query_name, kwargs in queries.items()
+        }
+        return {query_name: future.result() for query_name, future in futures.items()}
+
+
+def run_sql(sql: str, params: Optional[tuple] = None) -> pd.DataFrame:
+    """
+    Run an ad-hoc dashboard query with caching.
+
+    For page-specific SQL that has no query method. Identical
+    (sql, params) pairs are answered from the cache for 5 minutes.
+    """
+    try:
+        return _run_sql_cached(sql, params)
+    except errors.QueryCanceled:
+        st.warning(TIMEOUT_WARNING)
+        return pd.DataFrame()
+
+
+# max_entries bounds memory: every time range/filter is its own entry
+@st.cache_data(ttl="5m", max_entries=128, show_spinner=False)
+def _run_sql_cached(sql: str, params: Optional[tuple]) -> pd.DataFrame:
+    """Cached part of run_sql (runs on the analytics pool)."""
+    return get_db_connector('analytics').query(sql, params)
+
+
+# ========================================
+# STARTUP WARM-UP
+# ========================================
+# The first visitor shouldn't pay for cold connections and empty caches
+
+# The fetches every dashboard visit starts with
+WARMUP_QUERIES = [
+    ('get_overall_health', {}),
+    ('get_executive_bundle', {'issue_limit': 5, 'geo_limit': 10}),
+    ('get_device_breakdown', {}),
+    ('get_hourly_trend', {'hours': 24}),
+    ('get_peak_time_analysis', {}),
+]
+
+
+def _warm_up(db):
+    """Ping the pooled connections, then pre-fill the shared cache."""
+    try:
+        db.warm_pool()
+        for query_name, kwargs in WARMUP_QUERIES:
+            _fetch_shared(db, query_name, kwargs)
+        logger.info("🔥 Dashboard cache warmed")
+    except Exception as e:
+        logger.warning("⚠️ Warm-up failed (dashboards will load on demand): %s", e)
@@ -1,5 +1,6 @@
 import streamlit as st
 from datetime import datetime
+from db_connector import fetch_data, get_db_connector
 
 st.set_page_config(
     page_title="Streaming Service QoE Dashboards",
@@ -95,9 +96,11 @@ st.markdown("---")
 
 st.subheader("📈 Platform Statistics")
 
-from db_connector import fetch_data
-
 try:
+    # Open the shared connection pool (this connects right away) and start
+    # a background thread that pre-fills the other dashboards' caches
+    get_db_connector()
+
     health = fetch_data('get_overall_health').iloc[0]
 
     col1, col2, col3, col4 = st.columns(4)
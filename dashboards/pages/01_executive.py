@@ -4,7 +4,8 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 from datetime import datetime, timedelta
-from db_connector import fetch_data
+from db_connector import clear_cache, fetch_data
+from chart_utils import line_mode, lttb
 
 # ========================================
 # PAGE CONFIGURATION
@@ -67,11 +68,16 @@ with col2:
         value=datetime.now().strftime("%H:%M:%S")
     )
     if st.button("🔄 Refresh Data"):
-        st.cache_data.clear()
+        clear_cache()
         st.rerun()
 
 st.markdown("---")
 
+# Every panel below comes from ONE query that scans the fact table once
+# (.get: if the query timed out, every panel falls back to "no data")
+data = fetch_data('get_executive_bundle', issue_limit=5, geo_limit=10)
+no_data = pd.DataFrame()
+
 # ========================================
 # KEY METRICS (Big Numbers at Top)
 # ========================================
@@ -79,7 +85,7 @@ st.markdown("---")
 st.subheader("📊 Last 48 Hours Performance")
 
 # Fetch overall health data
-health_df = fetch_data('get_overall_health')
+health_df = data.get('health', no_data)
 
 if not health_df.empty:
     health = health_df.iloc[0]  # Get first (and only) row
@@ -159,7 +165,7 @@ st.markdown("---")
 
 st.subheader("📈 30-Day Quality Trend")
 
-trend_df = fetch_data('get_daily_trend', days=30)
+trend_df = data.get('trend', no_data)
 
 if not trend_df.empty:
     # Create a dual-axis chart
@@ -168,23 +174,28 @@ if not trend_df.empty:
         specs=[[{"secondary_y": True}]]
     )
 
+    # WebGL traces, downsampled if the series is long
+    dates = trend_df['date'].to_numpy()
+    qoe_x, qoe_y = lttb(dates, trend_df['avg_qoe_score'].to_numpy())
+    sessions_x, sessions_y = lttb(dates, trend_df['sessions'].to_numpy())
+
     # Add QoE Score line
     fig.add_trace(
-        go.Scatter(
-            x=trend_df['date'],
-            y=trend_df['avg_qoe_score'],
+        go.Scattergl(
+            x=qoe_x,
+            y=qoe_y,
             name='QoE Score',
             line=dict(color='#E50914', width=3),
-            mode='lines+markers'
+            mode=line_mode(len(qoe_x))
         ),
         secondary_y=False
     )
 
     # Add session volume as area chart
     fig.add_trace(
-        go.Scatter(
-            x=trend_df['date'],
-            y=trend_df['sessions'],
+        go.Scattergl(
+            x=sessions_x,
+            y=sessions_y,
             name='Sessions',
             fill='tozeroy',
             line=dict(color='rgba(100, 100, 255, 0.3)', width=1),
@@ -229,7 +240,7 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("🥧 Quality Distribution")
 
-    quality_df = fetch_data('get_quality_distribution')
+    quality_df = data.get('quality_dist', no_data)
 
     if not quality_df.empty:
         # Create pie chart
@@ -263,15 +274,13 @@ with col1:
 with col2:
     st.subheader("🌍 Top Countries by Volume")
 
-    geo_df = fetch_data('get_geographic_breakdown')
+    geo_df = data.get('geo', no_data)
 
     if not geo_df.empty:
-        # Get top 10 countries
-        top_geo = geo_df.nlargest(10, 'sessions')
-
+        # Already the top 10 countries (LIMIT in SQL)
         # Create horizontal bar chart
         fig = px.bar(
-            top_geo,
+            geo_df,
             y='country_code',
             x='sessions',
             orientation='h',
@@ -299,7 +308,7 @@ st.markdown("---")
 
 st.subheader("⚠️ Top Quality Issues (Last 24 Hours)")
 
-issues_df = fetch_data('get_top_issues', limit=5)
+issues_df = data.get('issues', no_data)
 
 if not issues_df.empty:
     # Style the dataframe
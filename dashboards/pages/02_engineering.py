@@ -5,7 +5,13 @@ from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from db_connector import fetch_data
+from db_connector import clear_cache, fetch_data_concurrent, run_sql
+from chart_utils import cache_figure, line_mode, lttb
+
+# QoE cell colors for the device table
+QOE_GREEN = 'background-color: #d4edda; color: #444'
+QOE_YELLOW = 'background-color: #fff3cd; color: #444'
+QOE_RED = 'background-color: #f8d7da; color: #444'
 
 # ========================================
 # PAGE CONFIGURATION
@@ -56,7 +62,7 @@ metric_focus = st.sidebar.radio(
 
 # Refresh button
 if st.sidebar.button("🔄 Refresh Data"):
-    st.cache_data.clear()
+    clear_cache()
     st.rerun()
 
 st.sidebar.markdown("---")
@@ -69,13 +75,20 @@ st.sidebar.info("💡 **Tip:** Click on legend items to toggle visibility")
 st.title("🔧 Netflix QoE Engineering Dashboard")
 st.markdown(f"**Technical Diagnostics** | {time_range}")
 
+# The three standard breakdowns are independent: fetch them in parallel
+data = fetch_data_concurrent({
+    'get_device_breakdown': {},
+    'get_hourly_trend': {'hours': min(hours, 48)},  # Max 48 hours for readability
+    'get_geo_summary': {'top_n': 15, 'qoe_target': 85},
+})
+
 # ========================================
 # DEVICE PERFORMANCE TABLE
 # ========================================
 
 st.subheader("📱 Device Performance Breakdown")
 
-device_df = fetch_data('get_device_breakdown')
+device_df = data['get_device_breakdown']
 
 if not device_df.empty:
     # Filter by selected devices
@@ -86,15 +99,10 @@ if not device_df.empty:
     device_df['avg_startup_sec'] = device_df['avg_startup_ms'] / 1000
 
     # Style based on performance
-    def color_qoe(val):
-        """Color code QoE scores."""
-        if val >= 80:
-            color = 'background-color: #d4edda; color: #444'  # Green
-        elif val >= 60:
-            color = 'background-color: #fff3cd; color: #444'  # Yellow
-        else:
-            color = 'background-color: #f8d7da; color: #444'  # Red
-        return color
+    def color_qoe(col):
+        """Color code QoE scores (whole column at once)."""
+        values = col.to_numpy()
+        return np.select([values >= 80, values >= 60], [QOE_GREEN, QOE_YELLOW], default=QOE_RED)
 
     # Display styled dataframe
     styled_df = device_df[['device_type', 'sessions', 'avg_qoe_score',
@@ -106,7 +114,7 @@ if not device_df.empty:
             'p95_startup_sec': '{:.2f}s',
             'avg_rebuffer_count': '{:.2f}'
         })\
-        .applymap(color_qoe, subset=['avg_qoe_score'])\
+        .apply(color_qoe, subset=['avg_qoe_score'])\
         .set_properties(**{'text-align': 'center'})
 
     st.dataframe(styled_df, use_container_width=True)
@@ -119,7 +127,7 @@ st.markdown("---")
 
 st.subheader(f"⏰ Hourly Trend - {metric_focus}")
 
-hourly_df = fetch_data('get_hourly_trend', hours=min(hours, 48))  # Max 48 hours for readability
+hourly_df = data['get_hourly_trend']
 
 if not hourly_df.empty:
     # Determine which metric to plot
@@ -132,13 +140,15 @@ if not hourly_df.empty:
 
     metric_col, metric_label, color_scale = metric_map[metric_focus]
 
-    # Create line chart with area fill
+    # Create line chart with area fill (WebGL, downsampled if long)
     fig = go.Figure()
 
-    fig.add_trace(go.Scatter(
-        x=hourly_df['hour'],
-        y=hourly_df[metric_col],
-        mode='lines+markers',
+    hour_x, metric_y = lttb(hourly_df['hour'].to_numpy(), hourly_df[metric_col].to_numpy())
+
+    fig.add_trace(go.Scattergl(
+        x=hour_x,
+        y=metric_y,
+        mode=line_mode(len(hour_x)),
         name=metric_label,
         fill='tozeroy',
         line=dict(color='#E50914', width=2),
@@ -173,57 +183,72 @@ st.markdown("---")
 # ========================================
 st.subheader("📊 Startup Time Distribution by Device")
 
+# Query for detailed percentiles (powers both the box plot and the table).
+# One PERCENTILE_DISC over an array of fractions = one sort per device, and
+# no interpolation: every value is a real observed startup time.
+percentile_query = """
+    SELECT
+        device_type,
+        p[1] as p05,
+        p[2] as p25,
+        p[3] as p50,
+        p[4] as p75,
+        p[5] as p90,
+        p[6] as p95,
+        p[7] as p99
+    FROM (
+        SELECT
+            dev.device_type,
+            PERCENTILE_DISC(ARRAY[0.05, 0.25, 0.50, 0.75, 0.90, 0.95, 0.99])
+                WITHIN GROUP (ORDER BY f.startup_time_ms) as p
+        FROM fact_playback_sessions f
+        JOIN dim_device dev ON f.device_key = dev.device_key
+        WHERE f.session_timestamp >= NOW() - make_interval(hours => %s)
+        GROUP BY dev.device_type
+    ) pct
+"""
+
+try:
+    percentile_df = run_sql(percentile_query, (hours,))
+except Exception as e:
+    st.error(f"Error loading startup percentiles: {e}")
+    percentile_df = pd.DataFrame(columns=['device_type', 'p05', 'p25', 'p50', 'p75', 'p90', 'p95', 'p99'])
+
 col1, col2 = st.columns(2)
 
 with col1:
-    # Box plot showing distribution
-    if not device_df.empty:
-        fig = go.Figure()
-        
-        for device in device_filter:
-            device_data = device_df[device_df['device_type'] == device]
-            
-            if not device_data.empty:
-                # Create synthetic distribution data for visualization
-                # In production, you'd query actual percentile data
-                fig.add_trace(go.Box(
-                    y=[device_data['avg_startup_ms'].values[0]],
-                    name=device,
-                    boxmean='sd'
-                ))
+    # Box plot built from the real percentiles:
+    # whiskers = p5/p95, box = p25-p75, line = median
+    box_df = percentile_df[percentile_df['device_type'].isin(device_filter)] \
+        if not percentile_df.empty else percentile_df
+
+    if not box_df.empty:
+        # One trace, one box per device: Plotly takes the stats as arrays
+        fig = go.Figure(go.Box(
+            x=box_df['device_type'],
+            lowerfence=box_df['p05'],
+            q1=box_df['p25'],
+            median=box_df['p50'],
+            q3=box_df['p75'],
+            upperfence=box_df['p95'],
+            marker_color='#E50914'
+        ))
 
         fig.update_layout(
             height=350,
             yaxis_title="Startup Time (ms)",
-            showlegend=True
+            showlegend=False
         )
 
         st.plotly_chart(fig, use_container_width=True)
-    
+
 with col2:
     # Percentile comparison table
     st.markdown("Startup Time Percentiles")
-    
-    # Query for detailed percentiles
-    percentile_query = """
-        SELECT
-            dev.device_type,
-            PERCENTILE_CONT(0.50) WITHIN GROUP (ORDER BY f.startup_time_ms) as p50,
-            PERCENTILE_CONT(0.75) WITHIN GROUP (ORDER BY f.startup_time_ms) as p75,
-            PERCENTILE_CONT(0.90) WITHIN GROUP (ORDER BY f.startup_time_ms) as p90,
-            PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY f.startup_time_ms) as p95,
-            PERCENTILE_CONT(0.99) WITHIN GROUP (ORDER BY f.startup_time_ms) as p99
-        FROM fact_playback_sessions f
-        JOIN dim_device dev ON f.device_key = dev.device_key
-        WHERE f.session_timestamp >= NOW() - INTERVAL '%s hours'
-        GROUP BY dev.device_type
-    """ % hours
-    
-    percentile_df = fetch_data('query', sql=percentile_query) if hasattr(fetch_data, 'query') else pd.DataFrame()
-    
+
     if not percentile_df.empty:
         st.dataframe(
-            percentile_df.style.format({
+            percentile_df[['device_type', 'p50', 'p75', 'p90', 'p95', 'p99']].style.format({
                 'p50': '{:.0f}ms',
                 'p75': '{:.0f}ms',
                 'p90': '{:.0f}ms',
@@ -234,8 +259,7 @@ with col2:
             hide_index=True
         )
     else:
-        # Fallback to device_df data
-        st.dataframe(device_df[['device_type', 'avg_startup_ms', 'p95_startup_ms']])
+        st.info("No sessions in the selected window yet.")
 	    
 st.markdown("---")  
 
@@ -245,35 +269,27 @@ st.markdown("---")
 
 st.subheader("🔥 Quality Heatmap: Hour × Device")
 
-# Query for heatmap data
+# Query for heatmap data (pre-aggregated per day in mv_hour_device_qoe)
 
 heatmap_query = """
     SELECT
-    t.hour,
-    dev.device_type,
-    AVG(f.overall_qoe_score) as avg_qoe
-    FROM fact_playback_sessions f
-    JOIN dim_time t ON f.time_key = t.time_key
-    JOIN dim_device dev ON f.device_key = dev.device_key
-    WHERE f.session_timestamp >= NOW() - INTERVAL '7 days'
-    GROUP BY t.hour, dev.device_type
-    ORDER BY t.hour, dev.device_type
+    hour,
+    device_type,
+    SUM(sum_qoe) / NULLIF(SUM(sessions), 0) as avg_qoe
+    FROM mv_hour_device_qoe
+    WHERE full_date >= CURRENT_DATE - 7
+    GROUP BY hour, device_type
+    ORDER BY hour, device_type
 """
 
-try:
-    from db_connector import get_db_connector
-    db = get_db_connector()
-    heatmap_df = db.query(heatmap_query)
-    
-    if not heatmap_df.empty:
-        # Pivot data for heatmap
-        heatmap_pivot = heatmap_df.pivot(
-            index='hour',
-            columns='device_type',
-            values='avg_qoe'
-        )
 
-    # Create heatmap
+@cache_figure
+def build_heatmap_fig(heatmap_df):
+    """Build the hour x device heatmap (reused across reruns with the same data)."""
+    # Reshape for heatmap: rows are already unique per (hour, device),
+    # so unstack directly instead of going through pivot()
+    heatmap_pivot = heatmap_df.set_index(['hour', 'device_type'])['avg_qoe'].unstack('device_type')
+
     fig = go.Figure(data=go.Heatmap(
         z=heatmap_pivot.values,
         x=heatmap_pivot.columns,
@@ -292,10 +308,18 @@ try:
         yaxis_title="Hour of Day",
         yaxis=dict(tickmode='linear')
     )
+    return fig
 
-    st.plotly_chart(fig, use_container_width=True)
 
-    st.caption("💡 **Interpretation:** Red = Poor Quality, Yellow = Fair, Green = Good")
+try:
+    heatmap_df = run_sql(heatmap_query)
+
+    if not heatmap_df.empty:
+        st.plotly_chart(build_heatmap_fig(heatmap_df), use_container_width=True)
+
+        st.caption("💡 **Interpretation:** Red = Poor Quality, Yellow = Fair, Green = Good")
+    else:
+        st.info("No heatmap data for the last 7 days yet.")
 
 except Exception as e:
     st.warning(f"⚠️ Could not generate heatmap: {e}")
@@ -308,7 +332,8 @@ st.markdown("---")
 
 st.subheader("🌍 Geographic Performance Analysis")
 
-geo_df = fetch_data('get_geographic_breakdown')
+geo = data['get_geo_summary']
+geo_df = geo.get('top', pd.DataFrame())
 
 if not geo_df.empty:
     col1, col2 = st.columns([2, 1])
@@ -316,7 +341,7 @@ if not geo_df.empty:
     with col1:
         # Bar chart: Countries by QoE
         fig = px.bar(
-            geo_df.nlargest(15, 'sessions'),
+            geo_df,
             x='country_code',
             y='avg_qoe_score',
             color='avg_qoe_score',
@@ -336,11 +361,12 @@ if not geo_df.empty:
     with col2:
         st.markdown("**Countries Below Target (QoE < 85)**")
     
-        poor_countries = geo_df[geo_df['avg_qoe_score'] < 85].sort_values('avg_qoe_score')
+        # Already filtered and sorted worst-first by the database
+        poor_countries = geo.get('below_target', pd.DataFrame())
     
         if not poor_countries.empty:
             st.dataframe(
-                poor_countries[['country_code', 'avg_qoe_score', 'pct_poor']].style.format({
+                poor_countries.style.format({
                     'avg_qoe_score': '{:.1f}',
                     'pct_poor': '{:.1f}%'
                 }),
@@ -358,33 +384,119 @@ st.markdown("---")
 
 st.subheader("🔍 Issue Deep Dive")
 
-tab1, tab2, tab3 = st.tabs(["High Startup Time", "Excessive Buffering", "Low Bitrate"])
-
-with tab1:
-    st.markdown("**Sessions with Startup Time > 4 seconds**")
-    startup_query = """
+# All three tabs come from one physical query: a shared base scan of the
+# window, then one aggregated branch per issue type tagged with `kind`.
+issues_query = """
+    WITH base AS MATERIALIZED (
         SELECT
             dev.device_type,
             g.country_code,
-            COUNT(*) as affected_sessions,
-            AVG(f.startup_time_ms)::INTEGER as avg_startup_ms,
-            PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY f.startup_time_ms)::INTEGER as p95_startup_ms
+            n.network_type,
+            f.startup_time_ms,
+            f.rebuffer_count,
+            f.rebuffer_ratio,
+            f.avg_bitrate_kbps,
+            f.resolution
         FROM fact_playback_sessions f
         JOIN dim_device dev ON f.device_key = dev.device_key
         JOIN dim_geography g ON f.geo_key = g.geo_key
-        WHERE f.startup_time_ms > 4000
-        AND f.session_timestamp >= NOW() - INTERVAL '%s hours'
-        GROUP BY dev.device_type, g.country_code
+        JOIN dim_network n ON f.network_key = n.network_key
+        WHERE f.session_timestamp >= NOW() - make_interval(hours => %s)
+        AND (f.startup_time_ms > 4000 OR f.rebuffer_count >= 3 OR f.avg_bitrate_kbps < 2000)
+    )
+    (
+        SELECT
+            'startup' as kind,
+            device_type,
+            country_code,
+            NULL as network_type,
+            COUNT(*) as affected_sessions,
+            AVG(startup_time_ms)::INTEGER as avg_startup_ms,
+            PERCENTILE_DISC(0.95) WITHIN GROUP (ORDER BY startup_time_ms) as p95_startup_ms,
+            NULL::DECIMAL(5,2) as avg_rebuffers,
+            NULL::DECIMAL(5,2) as avg_rebuffer_pct,
+            NULL::INTEGER as avg_bitrate,
+            NULL as common_resolution
+        FROM base
+        WHERE startup_time_ms > 4000
+        GROUP BY device_type, country_code
         HAVING COUNT(*) >= 5
         ORDER BY affected_sessions DESC
         LIMIT 20
-    """ % hours
-    
+    )
+    UNION ALL
+    (
+        SELECT
+            'rebuffer',
+            device_type,
+            NULL,
+            network_type,
+            COUNT(*),
+            NULL,
+            NULL,
+            AVG(rebuffer_count)::DECIMAL(5,2),
+            AVG(rebuffer_ratio)::DECIMAL(5,2),
+            NULL,
+            NULL
+        FROM base
+        WHERE rebuffer_count >= 3
+        GROUP BY device_type, network_type
+        HAVING COUNT(*) >= 5
+        ORDER BY COUNT(*) DESC
+        LIMIT 20
+    )
+    UNION ALL
+    (
+        SELECT
+            'bitrate',
+            device_type,
+            NULL,
+            network_type,
+            COUNT(*),
+            NULL,
+            NULL,
+            NULL,
+            NULL,
+            AVG(avg_bitrate_kbps)::INTEGER,
+            MODE() WITHIN GROUP (ORDER BY resolution)
+        FROM base
+        WHERE avg_bitrate_kbps < 2000
+        GROUP BY device_type, network_type
+        HAVING COUNT(*) >= 5
+        ORDER BY COUNT(*) DESC
+        LIMIT 20
+    )
+"""
+
+
+def issue_deep_dive(hours):
+    """Issue tabs: one combined query, sliced per tab."""
+    issues_error = None
     try:
-        db = get_db_connector()
-        startup_issues_df = db.query(startup_query)
-    
-        if not startup_issues_df.empty:
+        issues_df = run_sql(issues_query, (hours,))
+    except Exception as e:
+        issues_df = pd.DataFrame(columns=[
+            'kind', 'device_type', 'country_code', 'network_type', 'affected_sessions',
+            'avg_startup_ms', 'p95_startup_ms', 'avg_rebuffers', 'avg_rebuffer_pct',
+            'avg_bitrate', 'common_resolution'
+        ])
+        issues_error = e
+
+    def issues_for(kind, columns):
+        """Slice one tab's rows (and its own columns) out of the combined result."""
+        return issues_df.loc[issues_df['kind'] == kind, columns]
+
+    tab1, tab2, tab3 = st.tabs(["High Startup Time", "Excessive Buffering", "Low Bitrate"])
+
+    with tab1:
+        st.markdown("**Sessions with Startup Time > 4 seconds**")
+        startup_issues_df = issues_for('startup', [
+            'device_type', 'country_code', 'affected_sessions', 'avg_startup_ms', 'p95_startup_ms'
+        ])
+
+        if issues_error is not None:
+            st.error(f"Error: {issues_error}")
+        elif not startup_issues_df.empty:
             st.dataframe(
                 startup_issues_df,
                 column_config={
@@ -399,35 +511,16 @@ with tab1:
             )
         else:
             st.success("✅ No high startup time issues detected!")
-    except Exception as e:
-        st.error(f"Error: {e}")
-	    
-with tab2:
-    st.markdown("Sessions with 3+ Rebuffering Events")
-    
-    rebuffer_query = """
-        SELECT
-            dev.device_type,
-            n.network_type,
-            COUNT(*) as affected_sessions,
-            AVG(f.rebuffer_count)::DECIMAL(5,2) as avg_rebuffers,
-            AVG(f.rebuffer_ratio)::DECIMAL(5,2) as avg_rebuffer_pct
-        FROM fact_playback_sessions f
-        JOIN dim_device dev ON f.device_key = dev.device_key
-        JOIN dim_network n ON f.network_key = n.network_key
-        WHERE f.rebuffer_count >= 3
-        AND f.session_timestamp >= NOW() - INTERVAL '%s hours'
-        GROUP BY dev.device_type, n.network_type
-        HAVING COUNT(*) >= 5
-        ORDER BY affected_sessions DESC
-        LIMIT 20
-    """ % hours
-    
-    try:
-        db = get_db_connector()
-        rebuffer_issues_df = db.query(rebuffer_query)
-    
-        if not rebuffer_issues_df.empty:
+
+    with tab2:
+        st.markdown("Sessions with 3+ Rebuffering Events")
+        rebuffer_issues_df = issues_for('rebuffer', [
+            'device_type', 'network_type', 'affected_sessions', 'avg_rebuffers', 'avg_rebuffer_pct'
+        ])
+
+        if issues_error is not None:
+            st.error(f"Error: {issues_error}")
+        elif not rebuffer_issues_df.empty:
             st.dataframe(
                 rebuffer_issues_df,
                 column_config={
@@ -442,35 +535,16 @@ with tab2:
             )
         else:
             st.success("✅ No excessive buffering issues detected!")
-    except Exception as e:
-        st.error(f"Error: {e}")
-	    
-with tab3:
-    st.markdown("Sessions with Bitrate < 2000 kbps")
-    
-    bitrate_query = """
-        SELECT
-            dev.device_type,
-            n.network_type,
-            COUNT(*) as affected_sessions,
-            AVG(f.avg_bitrate_kbps)::INTEGER as avg_bitrate,
-            MODE() WITHIN GROUP (ORDER BY f.resolution) as common_resolution
-        FROM fact_playback_sessions f
-        JOIN dim_device dev ON f.device_key = dev.device_key
-        JOIN dim_network n ON f.network_key = n.network_key
-        WHERE f.avg_bitrate_kbps < 2000
-        AND f.session_timestamp >= NOW() - INTERVAL '%s hours'
-        GROUP BY dev.device_type, n.network_type
-        HAVING COUNT(*) >= 5
-        ORDER BY affected_sessions DESC
-        LIMIT 20
-    """ % hours
 
-    try:
-        db = get_db_connector()
-        bitrate_issues_df = db.query(bitrate_query)
-    
-        if not bitrate_issues_df.empty:
+    with tab3:
+        st.markdown("Sessions with Bitrate < 2000 kbps")
+        bitrate_issues_df = issues_for('bitrate', [
+            'device_type', 'network_type', 'affected_sessions', 'avg_bitrate', 'common_resolution'
+        ])
+
+        if issues_error is not None:
+            st.error(f"Error: {issues_error}")
+        elif not bitrate_issues_df.empty:
             st.dataframe(
                 bitrate_issues_df,
                 column_config={
@@ -485,8 +559,9 @@ with tab3:
             )
         else:
             st.success("✅ No low bitrate issues detected!")
-    except Exception as e:
-        st.error(f"Error: {e}")
+
+
+issue_deep_dive(hours)
 
 # ========================================
 # FOOTER
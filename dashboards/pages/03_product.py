@@ -3,8 +3,10 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
+import numpy as np
 from datetime import datetime
-from db_connector import fetch_data, get_db_connector
+from db_connector import clear_cache, fetch_data_concurrent, run_sql
+from chart_utils import cache_figure
 
 # ========================================
 # PAGE CONFIGURATION
@@ -41,11 +43,17 @@ days = days_map[date_range]
 
 with col2:
     if st.button("🔄 Refresh"):
-        st.cache_data.clear()
+        clear_cache()
         st.rerun()
 
 st.markdown("---")
 
+# Fetch the page's independent query-method results in parallel
+data = fetch_data_concurrent({
+    'get_peak_time_analysis': {},
+    'get_device_breakdown': {}
+})
+
 # ========================================
 # QUALITY VS ENGAGEMENT
 # ========================================
@@ -53,40 +61,26 @@ st.markdown("---")
 st.subheader("📊 Quality Impact on User Experience")
 
 # Query: correlation between quality and viewing duration
+# width_bucket() tiers each score once; labels are attached in pandas.
+# Bucket 0 = <40 (and unscored sessions), 1 = 40-59, 2 = 60-79, 3 = 80+
 correlation_query = """
     SELECT
-        CASE
-            WHEN overall_qoe_score >= 80 THEN 'Excellent (80+)'
-            WHEN overall_qoe_score >= 60 THEN 'Good (60-79)'
-            WHEN overall_qoe_score >= 40 THEN 'Fair (40-59)'
-            ELSE 'Poor (<40)'
-        END as quality_tier,
+        COALESCE(width_bucket(overall_qoe_score, ARRAY[40, 60, 80]::DECIMAL[]), 0) as bucket,
         COUNT(*) as sessions,
         AVG(session_duration_sec / 60.0)::DECIMAL(10,2) as avg_watch_time_min,
-        PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY session_duration_sec / 60.0) as median_watch_time_min
+        PERCENTILE_DISC(0.5) WITHIN GROUP (ORDER BY session_duration_sec / 60.0) as median_watch_time_min
     FROM fact_playback_sessions
-    WHERE session_timestamp >= NOW() - INTERVAL '%s days'
-    GROUP BY
-        CASE
-            WHEN overall_qoe_score >= 80 THEN 'Excellent (80+)'
-            WHEN overall_qoe_score >= 60 THEN 'Good (60-79)'
-            WHEN overall_qoe_score >= 40 THEN 'Fair (40-59)'
-            ELSE 'Poor (<40)'
-        END
-    -- ORDER BY
-    --     CASE
-    --         WHEN quality_tier = 'Excellent (80+)' THEN 1
-    --         WHEN quality_tier = 'Good (60-79)' THEN 2
-    --         WHEN quality_tier = 'Fair (40-59)' THEN 3
-    --         ELSE 4
-    --     END
-""" % days
+    WHERE session_timestamp >= NOW() - make_interval(days => %s)
+    GROUP BY bucket
+    ORDER BY bucket DESC
+"""
 
-try:
-    db = get_db_connector()
-    correlation_df = db.query(correlation_query)
+QUALITY_TIERS = {0: 'Poor (<40)', 1: 'Fair (40-59)', 2: 'Good (60-79)', 3: 'Excellent (80+)'}
 
+try:
+    correlation_df = run_sql(correlation_query, (days,))
     if not correlation_df.empty:
+        correlation_df['quality_tier'] = correlation_df['bucket'].map(QUALITY_TIERS)
         col1, col2 = st.columns(2)
 
         with col1:
@@ -129,19 +123,15 @@ try:
             )
             st.plotly_chart(fig, use_container_width=True)
 
-        # Key insight
-        excellent_data = correlation_df[correlation_df['quality_tier'] == 'Excellent (80+)']['avg_watch_time_min'].values
-        poor_data = correlation_df[correlation_df['quality_tier'] == 'Poor (<40)']['avg_watch_time_min'].values
-        
-        excellent_watch = excellent_data[0] if len(excellent_data) > 0 else 0
-        poor_watch = poor_data[0] if len(poor_data) > 0 else 0
+        # Key insight: compare the Excellent (bucket 3) and Poor (bucket 0) tiers
+        watch_by_bucket = correlation_df.set_index('bucket')['avg_watch_time_min']
+        excellent_watch = watch_by_bucket.get(3)
+        poor_watch = watch_by_bucket.get(0)
 
-        difference = excellent_watch - poor_watch
-
-        st.info(f"💡 **Key Insight:** Users with excellent quality watch {difference:.1f} minutes longer on average than those with poor quality!")
-        
-        if len(excellent_data) > 0:
-            st.info(f"💡 **Key Insight:** Excellent quality sessions detected with {excellent_data[0]:.1f} minutes average watch time.")
+        if excellent_watch is not None and poor_watch is not None:
+            difference = excellent_watch - poor_watch
+            st.info(f"💡 **Key Insight:** Users with excellent quality watch {difference:.1f} minutes longer on average "
+                    f"than those with poor quality ({excellent_watch:.1f} vs {poor_watch:.1f} min)!")
         else:
             st.info("💡 **Key Insight:** Insufficient data to compare quality tiers.")
 
@@ -156,9 +146,12 @@ st.markdown("---")
 
 st.subheader("⏰ When Do Users Watch?")
 
-peak_df = fetch_data('get_peak_time_analysis')
+peak_df = data['get_peak_time_analysis']
 
-if not peak_df.empty:
+
+@cache_figure
+def build_peak_fig(peak_df):
+    """Sessions (bars) and QoE (line) by hour of day."""
     # Create combo chart: sessions + quality
     fig = make_subplots(specs=[[{"secondary_y": True}]])
 
@@ -187,7 +180,6 @@ if not peak_df.empty:
     )
 
     # Highlight peak hours (7pm-11pm)
-    peak_hours = peak_df[peak_df['is_peak_time'] == True]
     fig.add_vrect(
         x0=19, x1=23,
         fillcolor="yellow", opacity=0.1,
@@ -206,29 +198,39 @@ if not peak_df.empty:
     fig.update_yaxes(title_text="Sessions", secondary_y=False)
     fig.update_yaxes(title_text="QoE Score", secondary_y=True)
 
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+if not peak_df.empty:
+    st.plotly_chart(build_peak_fig(peak_df), use_container_width=True)
 
     # Stats
     col1, col2, col3 = st.columns(3)
 
-    peak_sessions = peak_hours['sessions'].sum()
-    total_sessions = peak_df['sessions'].sum()
+    # Pull the columns out as NumPy arrays once and do all stats on them
+    hours_arr = peak_df['hour'].to_numpy()
+    sessions_arr = peak_df['sessions'].to_numpy(dtype=float)
+    qoe_arr = peak_df['avg_qoe_score'].to_numpy(dtype=float)
+    is_peak = peak_df['is_peak_time'].to_numpy(dtype=bool)
+
+    peak_sessions = sessions_arr[is_peak].sum()
+    total_sessions = sessions_arr.sum()
     peak_pct = (peak_sessions / total_sessions * 100)
+    busy_idx = int(sessions_arr.argmax())
 
     with col1:
         st.metric("Peak Hour Sessions", f"{peak_pct:.1f}%",
                  delta=f"{peak_sessions:,.0f} of {total_sessions:,.0f}")
 
     with col2:
-        peak_qoe = peak_hours['avg_qoe_score'].mean()
-        non_peak_qoe = peak_df[peak_df['is_peak_time'] == False]['avg_qoe_score'].mean()
+        peak_qoe = qoe_arr[is_peak].mean() if is_peak.any() else np.nan
+        non_peak_qoe = qoe_arr[~is_peak].mean() if (~is_peak).any() else np.nan
         st.metric("Peak Hour Quality", f"{peak_qoe:.1f}",
                  delta=f"{peak_qoe - non_peak_qoe:.1f} vs non-peak")
 
     with col3:
-        busiest_hour = peak_df.loc[peak_df['sessions'].idxmax()]
-        st.metric("Busiest Hour", f"{busiest_hour['hour']}:00",
-                 delta=f"{busiest_hour['sessions']:,.0f} sessions")
+        st.metric("Busiest Hour", f"{hours_arr[busy_idx]}:00",
+                 delta=f"{sessions_arr[busy_idx]:,.0f} sessions")
 
 st.markdown("---")
 
@@ -238,44 +240,57 @@ st.markdown("---")
 
 st.subheader("📱 Device Usage & Preferences")
 
-device_df = fetch_data('get_device_breakdown')
+device_df = data['get_device_breakdown']
+
+
+@cache_figure
+def build_device_pie_fig(device_df):
+    """Share of sessions per device type."""
+    fig = px.pie(
+        device_df,
+        values='sessions',
+        names='device_type',
+        title="Device Mix",
+        hole=0.4,
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    fig.update_layout(height=350)
+    return fig
+
+
+@cache_figure
+def build_device_scatter_fig(device_df):
+    """Session volume vs quality per device type."""
+    fig = px.scatter(
+        device_df,
+        x='sessions',
+        y='avg_qoe_score',
+        size='sessions',
+        color='device_type',
+        text='device_type',
+        title="Device Volume vs Quality",
+        labels={'sessions': 'Session Volume', 'avg_qoe_score': 'Quality Score'}
+    )
+
+    # Add target line
+    fig.add_hline(y=85, line_dash="dash", line_color="green")
+
+    fig.update_traces(textposition='top center')
+    fig.update_layout(height=350, showlegend=False)
+    return fig
+
 
 if not device_df.empty:
     col1, col2 = st.columns(2)
 
     with col1:
         # Pie chart: device distribution
-        fig = px.pie(
-            device_df,
-            values='sessions',
-            names='device_type',
-            title="Device Mix",
-            hole=0.4,
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
-        fig.update_traces(textposition='inside', textinfo='percent+label')
-        fig.update_layout(height=350)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(build_device_pie_fig(device_df), use_container_width=True)
 
     with col2:
         # Scatter: sessions vs quality by device
-        fig = px.scatter(
-            device_df,
-            x='sessions',
-            y='avg_qoe_score',
-            size='sessions',
-            color='device_type',
-            text='device_type',
-            title="Device Volume vs Quality",
-            labels={'sessions': 'Session Volume', 'avg_qoe_score': 'Quality Score'}
-        )
-
-        # Add target line
-        fig.add_hline(y=85, line_dash="dash", line_color="green")
-
-        fig.update_traces(textposition='top center')
-        fig.update_layout(height=350, showlegend=False)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(build_device_scatter_fig(device_df), use_container_width=True)
 
 st.markdown("---")
 
@@ -285,22 +300,21 @@ st.markdown("---")
 
 st.subheader("📅 Weekend vs Weekday Patterns")
 
+# One row per day from mv_daily_stats instead of scanning every session
 weekday_query = """
     SELECT
-        CASE WHEN d.is_weekend THEN 'Weekend' ELSE 'Weekday' END as day_type,
-        COUNT(*) as sessions,
-        AVG(f.session_duration_sec / 60.0)::DECIMAL(10,2) as avg_watch_time_min,
-        AVG(f.overall_qoe_score)::DECIMAL(5,2) as avg_qoe_score,
-        SUM(f.session_duration_sec / 3600.0)::DECIMAL(12,2) as total_watch_hours
-    FROM fact_playback_sessions f
-    JOIN dim_date d ON f.date_key = d.date_key
-    WHERE d.full_date >= CURRENT_DATE - INTERVAL '%s days'
-    GROUP BY d.is_weekend
-""" % days
+        CASE WHEN is_weekend THEN 'Weekend' ELSE 'Weekday' END as day_type,
+        SUM(sessions) as sessions,
+        (SUM(sum_duration_sec) / 60.0 / NULLIF(SUM(watched_sessions), 0))::DECIMAL(10,2) as avg_watch_time_min,
+        (SUM(sum_qoe) / NULLIF(SUM(scored_sessions), 0))::DECIMAL(5,2) as avg_qoe_score,
+        (SUM(sum_duration_sec) / 3600.0)::DECIMAL(12,2) as total_watch_hours
+    FROM mv_daily_stats
+    WHERE full_date >= CURRENT_DATE - %s
+    GROUP BY is_weekend
+"""
 
 try:
-    db = get_db_connector()
-    weekday_df = db.query(weekday_query)
+    weekday_df = run_sql(weekday_query, (days,))
 
     if not weekday_df.empty:
         col1, col2, col3, col4 = st.columns(4)
@@ -351,39 +365,45 @@ st.markdown("---")
 
 st.subheader("🎬 Content Type Analysis")
 
+# Rolled up from one row per (day, content type, genre) in mv_content_daily
 content_query = """
     SELECT
-        c.content_type,
-        c.genre,
-        COUNT(*) as sessions,
-        AVG(f.overall_qoe_score)::DECIMAL(5,2) as avg_qoe_score,
-        AVG(f.session_duration_sec / 60.0)::DECIMAL(10,2) as avg_watch_time_min
-    FROM fact_playback_sessions f
-    JOIN dim_content c ON f.content_key = c.content_key
-    WHERE f.session_timestamp >= NOW() - INTERVAL '%s days'
-    GROUP BY c.content_type, c.genre
-    HAVING COUNT(*) >= 50
+        content_type,
+        genre,
+        SUM(sessions) as sessions,
+        (SUM(sum_qoe) / NULLIF(SUM(scored_sessions), 0))::DECIMAL(5,2) as avg_qoe_score,
+        (SUM(sum_duration_sec) / 60.0 / NULLIF(SUM(watched_sessions), 0))::DECIMAL(10,2) as avg_watch_time_min
+    FROM mv_content_daily
+    WHERE session_date >= CURRENT_DATE - %s
+    GROUP BY content_type, genre
+    HAVING SUM(sessions) >= 50
     ORDER BY sessions DESC
     LIMIT 15
-""" % days
+"""
+
+
+@cache_figure
+def build_content_treemap_fig(content_df):
+    """Content type > genre treemap sized by sessions, colored by QoE."""
+    fig = px.treemap(
+        content_df,
+        path=[px.Constant("All Content"), 'content_type', 'genre'],
+        values='sessions',
+        color='avg_qoe_score',
+        color_continuous_scale='RdYlGn',
+        hover_data=['avg_watch_time_min']
+    )
+
+    fig.update_layout(height=450)
+    return fig
+
 
 try:
-    db = get_db_connector()
-    content_df = db.query(content_query)
+    content_df = run_sql(content_query, (days,))
 
     if not content_df.empty:
         # Treemap: content by sessions
-        fig = px.treemap(
-            content_df,
-            path=[px.Constant("All Content"), 'content_type', 'genre'],
-            values='sessions',
-            color='avg_qoe_score',
-            color_continuous_scale='RdYlGn',
-            hover_data=['avg_watch_time_min']
-        )
-
-        fig.update_layout(height=450)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(build_content_treemap_fig(content_df), use_container_width=True)
 
         st.caption("💡 **How to read:** Larger boxes = more sessions. Color shows quality (green=good, red=poor)")
 
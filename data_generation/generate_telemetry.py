@@ -1,16 +1,28 @@
 import pandas as pd
 import numpy as np 
+import pyarrow as pa
+import pyarrow.parquet as pq
 from faker import Faker
 from datetime import datetime, timedelta
-import random
-import uuid
 import os
-
-# initialize faker
-fake = Faker()
+from concurrent.futures import ProcessPoolExecutor
 
 ################################# CONFIGURATION SETTINGS #################################
 
+# Random seed: set the SEED environment variable (e.g. SEED=42) to get the
+# same data on every run; leave it unset for fresh data each time
+SEED = int(os.environ['SEED']) if os.environ.get('SEED') else None
+
+# Last day of the generated 30-day window. Timestamps are placed relative to
+# it, so reproducible runs also need it pinned: set END_DATE (e.g.
+# END_DATE=2025-10-10) together with SEED. Unset means "now".
+END_DATE = datetime.fromisoformat(os.environ['END_DATE']) if os.environ.get('END_DATE') else None
+
+# initialize faker (seeded too, so the user agent pool repeats as well)
+fake = Faker()
+if SEED is not None:
+    Faker.seed(SEED)
+
 # How many viewing sessions to generate
 NUM_SESSIONS = 100000   # Number of sessions to generate
 
@@ -20,6 +32,10 @@ DEVICE_TYPES = ['smart_tv', 'mobile', 'web', 'tablet']
 # Device probabilities (smart TVs are most popular for this streaming service)
 DEVICE_WEIGHTS = [0.45, 0.30, 0.15, 0.10]  # weights must add up to 1.0
 
+# Frame-drop multiplier per device, in DEVICE_TYPES order
+# (bigger screens show dropped frames more)
+DEVICE_QUALITY_FACTORS = np.array([1.5, 1.0, 1.2, 1.0])  # smart_tv, mobile, web, tablet
+
 # Network Types
 NETWORK_TYPES = ['wifi', 'cellular_5g', 'cellular_4g', 'ethernet']
 
@@ -29,39 +45,106 @@ COUNTRIES = ['US', 'BR', 'IN', 'GB', 'FR', 'DE', 'MX', 'JP', 'KR']
 # Content IDs (show or movie IDs)
 CONTENT_IDS = [f"content_{i}" for i in range(1, 1001)] # 1000 shows/movies
 
+# CDN points of presence: 'US-1' ... 'US-5' for every country
+CDN_POPS_PER_COUNTRY = 5
+CDN_POPS = [f"{country}-{pop}" for country in COUNTRIES for pop in range(1, CDN_POPS_PER_COUNTRY + 1)]
+
 # ISPs (top ISPs for this streaming service)
 ISPS = ['comcast', 'verizon', 'att', 'charter', 'cox', 'vodafone', 'bt', 'orange']
 
+# Video resolutions (best to worst)
+RESOLUTIONS = ['4K', '1080p', '720p', '480p']
+
+# Quality tiers each network can stream, with their bitrates (kbps)
+QUALITY_TIERS = {
+    'ethernet': {
+        '4K': (20000, 25000),       # Amazing quality
+        '1080p': (5000, 8000),      # HD
+        '720p': (2500, 4000),       # Good
+        '480p': (1000, 2000)        # OK
+    },
+    'wifi': {
+        '4K': (18000, 23000),
+        '1080p': (4500, 7000),
+        '720p': (2000, 3500),
+        '480p': (800, 1500)
+    },
+    'cellular_5g': {
+        '1080p': (4000, 6000),
+        '720p': (2000, 3000),
+        '480p': (800, 1200)
+    },
+    'cellular_4g': {
+        '720p': (1500, 2500),
+        '480p': (500, 1000)
+    }
+}
+
+# The same tiers as lookup tables (row = network in NETWORK_TYPES order):
+# TIER_LOW/TIER_HIGH[network, resolution] = bitrate range (0 if unavailable),
+# TIER_OPTIONS[network, :TIER_COUNT[network]] = resolutions it can stream
+TIER_LOW = np.array([[QUALITY_TIERS[n].get(r, (0, 0))[0] for r in RESOLUTIONS] for n in NETWORK_TYPES])
+TIER_HIGH = np.array([[QUALITY_TIERS[n].get(r, (0, 0))[1] for r in RESOLUTIONS] for n in NETWORK_TYPES])
+TIER_COUNT = np.array([len(QUALITY_TIERS[n]) for n in NETWORK_TYPES])
+TIER_OPTIONS = np.array(
+    [[RESOLUTIONS.index(q) for q in QUALITY_TIERS[n]] + [0] * (len(RESOLUTIONS) - len(QUALITY_TIERS[n]))
+     for n in NETWORK_TYPES],
+    dtype=np.int8
+)
+
+# App versions in use: v15.0.0 ... v18.9.9
+APP_VERSIONS = [f'v{major}.{minor}.{patch}'
+                for major in range(15, 19) for minor in range(10) for patch in range(10)]
+
+# How many distinct fake user agents to create (sessions sample from this pool)
+USER_AGENT_POOL_SIZE = 1000
+
+# Sessions generated per chunk (bigger runs spread chunks over CPU cores)
+SESSIONS_PER_CHUNK = 100000
+
 
 
 ################################# HELPER FUNCTIONS #################################
 
-def generate_session_id():
+def generate_session_ids(rng, n):
     """
     Create a unique ID for each viewing session.
     UUID = Universally Unique Identifier (basically impossible to duplicate)
-    """
-    return str(uuid.uuid4())
 
-def generate_user_id():
-    """
-    Create a unique user ID.
-    In reality, a service like Netflix has 300M users, here we'll simulate 1M
+    WHY NOT uuid.uuid4() PER SESSION?
+    Each call asks the OS for 16 random bytes and builds a UUID object.
+    Here all n*16 bytes come from the chunk's random generator at once
+    (so a seed reproduces the IDs too) and the version-4 bits are stamped
+    on the whole array, which gives exactly the same kind of IDs.
     """
-    return f'user_{random.randint(1, 1000000)}'
+    raw = np.frombuffer(rng.bytes(16 * n), dtype=np.uint8).reshape(n, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # Version 4 (random)
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
 
-def generate_timestamp(start_date, end_date):
+    hex_all = raw.tobytes().hex()
+    return [
+        f'{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}'
+        for h in (hex_all[i:i + 32] for i in range(0, 32 * n, 32))
+    ]
+
+def generate_timestamps(rng, start_date, end_date, n):
     """
-    Create a random timestamp between two dates.
+    Create n random timestamps between two dates, in chronological order.
     This makes our data look like it happened over time (not all at once)
+
+    All offsets (in whole seconds) are drawn at once and added to the start
+    date as a datetime64 column - no Python datetime objects per session.
+    Sorting just this one array means the finished table never has to be
+    re-sorted by timestamp (which would shuffle every column).
     """
     time_between = end_date - start_date
-    random_seconds = random.randint(0, int(time_between.total_seconds()))
-    return start_date + timedelta(seconds=random_seconds)
+    random_seconds = rng.integers(0, int(time_between.total_seconds()), size=n, endpoint=True)
+    random_seconds.sort()
+    return pd.Timestamp(start_date) + pd.to_timedelta(random_seconds, unit='s')
 
-def generate_startup_time(device_type, network_type):
+def generate_startup_times(rng, device_idx, network_idx):
     """
-    Generate realistic startup time in milliseconds.
+    Generate realistic startup times in milliseconds (one per session).
 
     WHY DIFFERENT TIMES?
     - Smart TVs are slower (bigger, more processing)
@@ -70,6 +153,12 @@ def generate_startup_time(device_type, network_type):
 
     We use normal distribution (bell curve) because most times are average,
     some are fast, some are slow - just like real life!
+
+    WHY ARRAYS?
+    device_idx/network_idx are integer codes (positions in DEVICE_TYPES /
+    NETWORK_TYPES). Looking up every session's base time and multiplier
+    with one array index, then drawing ALL normal samples in one call,
+    keeps the work in NumPy's C code instead of a Python loop.
     """
     # Base startup times by device (in milliseconds)
     base_times = {
@@ -87,24 +176,26 @@ def generate_startup_time(device_type, network_type):
         'cellular_4g': 1.8    # 4G is slower
     }
 
-    base = base_times[device_type]
-    multiplier = network_multipliers[network_type]
+    base = np.array([base_times[d] for d in DEVICE_TYPES])[device_idx]
+    multiplier = np.array([network_multipliers[n] for n in NETWORK_TYPES])[network_idx]
 
     # Add randomness using normal distribution
-    # np.random.normal(mean, standard_deviation)
+    # rng.normal(mean, standard_deviation) - here one mean/sd per session
     # Standard deviation = how spread out the values are
-    startup_time = np.random.normal(base * multiplier, base * 0.3)
+    startup_times = rng.normal(base * multiplier, base * 0.3)
 
     # Make sure it's not negative (impossible!) and at least 100ms
-    return max(100, int(startup_time))
+    return np.maximum(100, startup_times.astype(np.int32))
 
-def generate_rebuffer_events(network_type, session_duration_sec):
+def generate_rebuffer_events(rng, network_idx, session_duration_sec):
     """
     Generate buffering events - those annoying pauses!
 
     WHY THIS MATTERS:
     - Bad networks = more buffering
     - Longer sessions = more chances to buffer
+
+    Returns (rebuffer_count, rebuffer_duration_ms) arrays, one value per session.
     """
     # Probability of buffering per minute of viewing
     rebuffer_rates = {
@@ -114,23 +205,24 @@ def generate_rebuffer_events(network_type, session_duration_sec):
         'cellular_4g': 0.25   # Buffers often (frustrating!)
     }
 
-    rate = rebuffer_rates[network_type]
+    rate = np.array([rebuffer_rates[n] for n in NETWORK_TYPES])[network_idx]
     viewing_minutes = session_duration_sec / 60
 
     # Poisson distribution - models random events over time
     # (like how many cars pass by in an hour)
-    rebuffer_count = np.random.poisson(rate * viewing_minutes)
+    rebuffer_count = rng.poisson(rate * viewing_minutes).astype(np.int16)  # At most a few dozen
 
-    # Each rebuffer event lasts 1-5 seconds
-    if rebuffer_count > 0:
-        rebuffer_duration = sum([random.randint(1000, 5000)
-                                for _ in range(rebuffer_count)])
-    else:
-        rebuffer_duration = 0
+    # Each rebuffer event lasts 1-5 seconds:
+    # draw every event at once, then add them up per session
+    event_durations = rng.integers(1000, 5000, size=rebuffer_count.sum(), endpoint=True)
+    event_session = np.repeat(np.arange(len(rebuffer_count)), rebuffer_count)
+    rebuffer_duration = np.bincount(
+        event_session, weights=event_durations, minlength=len(rebuffer_count)
+    ).astype(np.int32)
 
     return rebuffer_count, rebuffer_duration
 
-def generate_bitrate(network_type):
+def generate_bitrates(rng, network_idx):
     """
     Generate video quality (bitrate) based on network speed.
 
@@ -140,63 +232,47 @@ def generate_bitrate(network_type):
     - Low pressure (bitrate) = blurry, pixelated picture
 
     Account for automatically adjusts quality based on your internet speed!
-    """
-    # Quality tiers with their bitrates (kbps)
-    quality_tiers = {
-        'ethernet': {
-            '4K': (20000, 25000),       # Amazing quality
-            '1080p': (5000, 8000),      # HD
-            '720p': (2500, 4000),       # Good
-            '480p': (1000, 2000)        # OK
-        },
-        'wifi': {
-            '4K': (18000, 23000),
-            '1080p': (4500, 7000),
-            '720p': (2000, 3500),
-            '480p': (800, 1500)
-        },
-        'cellular_5g': {
-            '1080p': (4000, 6000),
-            '720p': (2000, 3000),
-            '480p': (800, 1200)
-        },
-        'cellular_4g': {
-            '720p': (1500, 2500),
-            '480p': (500, 1000)
-        }
-    }
 
-    # Pick a quality tier for this network
-    available_qualities = list(quality_tiers[network_type].keys())
-    quality = random.choice(available_qualities)
-
-    # Get bitrate range and pick random value in that range
-    bitrate_range = quality_tiers[network_type][quality]
-    bitrate = random.randint(bitrate_range[0], bitrate_range[1])
+    Returns (bitrate_kbps, resolution_idx) arrays, one value per session
+    (resolution_idx = position in RESOLUTIONS).
+    """
+    # Pick one of the network's available tiers for every session
+    # (tiers are equally likely), then a bitrate inside that tier's range
+    pick = rng.integers(0, TIER_COUNT[network_idx])
+    resolution_idx = TIER_OPTIONS[network_idx, pick]
+    bitrate = rng.integers(
+        TIER_LOW[network_idx, resolution_idx], TIER_HIGH[network_idx, resolution_idx], endpoint=True
+    ).astype(np.int32)
 
-    return bitrate, quality
+    return bitrate, resolution_idx
 
-def inject_realistic_bugs(df):
+def inject_realistic_bugs(df, rng):
     """
     Add realistic bugs that platform engineers would need to find!
     """
     print("\n🐛 Injecting realistic bugs...")
 
     # Bug 1: iOS 15.3 has 2x slower startup on iPhones
-    ios_15_3_mask = df['os_version'].str.contains('iPhone', na=False) & \
-                    (df['device_type'] == 'mobile')
-
-    # 20% of mobile users have this iOS version
-    ios_15_3_users = df[ios_15_3_mask].sample(frac=0.20)
+    # os_version is a category column over the small user agent pool, so
+    # check each pool entry for 'iPhone' once and look the answer up by code
+    os_codes = df['os_version'].cat.codes.to_numpy()
+    iphone_pool_mask = np.asarray(df['os_version'].cat.categories.str.contains('iPhone'))
+    iphone_mask = iphone_pool_mask[os_codes] & (os_codes >= 0)
+
+    # 20% of mobile users have this iOS version: one coin flip per row
+    # picks them directly, no sampled copy of the matching rows needed
+    ios_15_3_mask = iphone_mask & \
+                    (df['device_type'] == 'mobile').to_numpy() & \
+                    (rng.random(len(df)) < 0.20)
 
     # Double their startup time
-    df.loc[ios_15_3_users.index, 'startup_time_ms'] *= 2
+    df.loc[ios_15_3_mask, 'startup_time_ms'] *= 2
 
-    print(f"  - Added iOS 15.3 bug affecting {len(ios_15_3_users):,} sessions")
+    print(f"  - Added iOS 15.3 bug affecting {ios_15_3_mask.sum():,} sessions")
 
     # Bug 2: Certain content (content_42) has encoding issues on Smart TVs
-    problem_content = (df['content_id'] == 'content_42') & \
-                      (df['device_type'] == 'smart_tv')
+    problem_content = (df['content_id'] == 'content_42').to_numpy() & \
+                      (df['device_type'] == 'smart_tv').to_numpy()
 
     # These sessions buffer way more
     df.loc[problem_content, 'rebuffer_count'] *= 3
@@ -206,8 +282,8 @@ def inject_realistic_bugs(df):
 
     # Bug 3: Brazilian ISP "BrazilNet" has routing issues
     # (higher latency = slower startup)
-    brazil_isp_issue = (df['country_code'] == 'BR') & \
-                       (df['isp'] == 'Comcast')  # Pretend "Comcast" is "BrazilNet" in Brazil
+    brazil_isp_issue = (df['country_code'] == 'BR').to_numpy() & \
+                       (df['isp'] == 'Comcast').to_numpy()  # Pretend "Comcast" is "BrazilNet" in Brazil
 
     df.loc[brazil_isp_issue, 'startup_time_ms'] += 1500  # Add 1.5 second delay
 
@@ -215,7 +291,7 @@ def inject_realistic_bugs(df):
 
     return df
 
-def add_realistic_time_patterns(df):
+def add_realistic_time_patterns(df, rng):
     """
     Make viewing patterns match real user behavior.
     Peak hours: 7pm-11pm
@@ -223,23 +299,29 @@ def add_realistic_time_patterns(df):
     """
     print("\n📅 Adding time-based viewing patterns...")
 
-    # Add hour and day of week
-    df['hour'] = df['timestamp'].dt.hour
-    df['day_of_week'] = df['timestamp'].dt.dayofweek  # 0=Monday, 6=Sunday
+    # Add hour and day of week straight from the raw nanosecond values
+    # (1970-01-01 was a Thursday, so day 0 is weekday 3)
+    ns = df['timestamp'].to_numpy().view(np.int64)
+    days, ns_into_day = np.divmod(ns, 86_400 * 10**9)
+    df['hour'] = (ns_into_day // (3_600 * 10**9)).astype(np.int8)
+    df['day_of_week'] = ((days + 3) % 7).astype(np.int8)  # 0=Monday, 6=Sunday
 
     # Weight sessions toward peak times
     # We'll do this by duplicating some sessions during peak hours
     peak_hours = (df['hour'] >= 19) & (df['hour'] <= 23)
-    weekend = df['day_of_week'].isin([5, 6])  # Friday, Saturday
+    weekend = df['day_of_week'] >= 5  # Saturday, Sunday
 
     # Sessions during peak times get duplicated (simulating more viewers)
-    peak_sessions = df[peak_hours | weekend].sample(frac=0.3)
+    peak_idx = np.flatnonzero((peak_hours | weekend).to_numpy())
+    chosen = rng.choice(peak_idx, size=round(0.3 * len(peak_idx)), replace=False)
 
-    print(f"  - Added {len(peak_sessions):,} additional peak-time sessions")
+    print(f"  - Added {len(chosen):,} additional peak-time sessions")
 
-    # Combine original + peak duplicates
-    df_enhanced = pd.concat([df, peak_sessions], ignore_index=True)
-    df_enhanced = df_enhanced.sort_values('timestamp').reset_index(drop=True)
+    # Combine original + peak duplicates in ONE gather, already in time
+    # order, instead of concat (full copy) followed by a sort (another one)
+    rows = np.concatenate([np.arange(len(df)), chosen])
+    rows = rows[np.argsort(ns[rows], kind='stable')]
+    df_enhanced = df.take(rows).reset_index(drop=True)
 
     return df_enhanced
 
@@ -253,8 +335,10 @@ def validate_telemetry_data(df):
     issues = []
 
     # Check 1: No missing values
-    missing = df.isnull().sum()
-    if missing.any():
+    # (a plain yes/no over the whole table first; the per-column counts
+    # are only worth computing when something is actually missing)
+    if df.isna().to_numpy().any():
+        missing = df.isna().sum()
         issues.append(f"❌ Found missing values:\n{missing[missing > 0]}")
     else:
         print("✅ No missing values")
@@ -302,85 +386,132 @@ def validate_telemetry_data(df):
 
 ################################# MAIN GENERATION FUNCTION #################################
 
-def generate_telemetry_data(num_sessions=NUM_SESSIONS):
+def generate_session_chunk(timestamps, seed, user_agent_pool):
     """
-    This is the main function that creates all our fake streaming data!
+    Generate one block of sessions with its own random generator.
+
+    WHY COLUMN BY COLUMN?
+    Instead of building one session at a time in a Python loop, every
+    column is drawn for ALL sessions in a single NumPy call. The random
+    choices become integer codes that index into lookup arrays, so
+    nothing runs per row in Python except the string-based IDs.
+
+    Low-cardinality text columns (device, network, country, ISP,
+    resolution, user agent, CDN) are built straight from those codes as pandas
+    'category' columns: 1 byte per row plus a tiny list of labels.
+    Numbers use the smallest integer type that fits (int32, or int16 for
+    counts), so every later pass over them moves half the bytes or less.
     """
-    print(f"🎬 Generating {num_sessions:,} stream viewing sessions...")
-    print("This will take about 30 seconds...\n")
+    num_sessions = len(timestamps)
+    rng = np.random.default_rng(seed)
+
+    # Pick random values for every session (as positions in the lists)
+    device_idx = rng.choice(len(DEVICE_TYPES), size=num_sessions, p=DEVICE_WEIGHTS)
+    network_idx = rng.integers(0, len(NETWORK_TYPES), size=num_sessions)
+    country_idx = rng.integers(0, len(COUNTRIES), size=num_sessions)
+
+    # Generate realistic session duration (people watch 5-120 minutes)
+    session_duration_sec = rng.integers(300, 7200, size=num_sessions, endpoint=True, dtype=np.int32)  # 5 min to 2 hours
+
+    # Generate metrics based on conditions
+    startup_time = generate_startup_times(rng, device_idx, network_idx)
+    rebuffer_count, rebuffer_duration = generate_rebuffer_events(
+        rng, network_idx, session_duration_sec
+    )
+    bitrate, resolution_idx = generate_bitrates(rng, network_idx)
+
+    # Calculate frames dropped (better devices drop fewer frames)
+    quality_factor = DEVICE_QUALITY_FACTORS[device_idx]
+    frames_dropped = rng.poisson(rebuffer_count * 10 * quality_factor).astype(np.int16)
+
+    # Build the table straight from the columns (like columns in Excel)
+    return pd.DataFrame({
+        'session_id': generate_session_ids(rng, num_sessions),
+        'user_id': np.char.add('user_', rng.integers(1, 1000000, size=num_sessions, endpoint=True).astype(str)).astype(object),
+        'timestamp': timestamps,
+        'device_type': pd.Categorical.from_codes(device_idx, categories=DEVICE_TYPES),
+        'os_version': pd.Categorical.from_codes(  # Fake but realistic OS info
+            rng.integers(0, len(user_agent_pool), size=num_sessions), categories=user_agent_pool
+        ),
+        'app_version': np.array(APP_VERSIONS, dtype=object)[rng.integers(0, len(APP_VERSIONS), size=num_sessions)],
+        'content_id': np.array(CONTENT_IDS, dtype=object)[rng.integers(0, len(CONTENT_IDS), size=num_sessions)],
+
+        # Performance metrics
+        'startup_time_ms': startup_time,
+        'rebuffer_count': rebuffer_count,
+        'rebuffer_duration_ms': rebuffer_duration,
+        'bitrate_kbps': bitrate,
+        'resolution': pd.Categorical.from_codes(resolution_idx, categories=RESOLUTIONS),
+        'frames_dropped': frames_dropped,
+        'session_duration_sec': session_duration_sec,
+
+        # Context
+        'network_type': pd.Categorical.from_codes(network_idx, categories=NETWORK_TYPES),
+        'country_code': pd.Categorical.from_codes(country_idx, categories=COUNTRIES),
+        'isp': pd.Categorical.from_codes(rng.integers(0, len(ISPS), size=num_sessions), categories=ISPS),
+        'cdn_pop': pd.Categorical.from_codes(  # CDN location, e.g. 'BR-2'
+            country_idx * CDN_POPS_PER_COUNTRY + rng.integers(0, CDN_POPS_PER_COUNTRY, size=num_sessions),
+            categories=CDN_POPS
+        )
+    })
 
-    # Create empty list to store all sessions
-    sessions = []
 
+def iter_telemetry_chunks(num_sessions=NUM_SESSIONS, seed=SEED):
+    """
+    Yield the sessions as DataFrames of up to SESSIONS_PER_CHUNK rows,
+    in chronological order.
+
+    WHY CHUNKS AND PROCESSES?
+    Sessions are independent, so big runs are split into blocks of
+    SESSIONS_PER_CHUNK and each block is generated on its own CPU core.
+    Every block gets its own child of one SeedSequence: the random
+    streams never overlap, and a fixed seed reproduces the NumPy draws.
+    Handing blocks out one at a time lets the caller write and forget
+    each one instead of holding the whole dataset in memory.
+    """
     # Date range for our data (last 30 days)
-    end_date = datetime.now()
+    end_date = END_DATE or datetime.now()
     start_date = end_date - timedelta(days=30)
 
-    # Generate each session one by one
-    for i in range(num_sessions):
-        # Show progress every 10,000 sessions
-        if i % 10000 == 0 and i > 0:
-            print(f"  Generated {i:,} sessions...")
+    # Faker is slow, so only build a pool of user agents once and
+    # let every session pick one of them
+    # (duplicates removed so the pool can serve as category labels)
+    user_agent_pool = pd.unique(np.array([fake.user_agent() for _ in range(USER_AGENT_POOL_SIZE)], dtype=object))
+
+    # One random stream for the timestamps plus one per chunk
+    chunk_starts = range(0, num_sessions, SESSIONS_PER_CHUNK)
+    ts_seed, *seeds = np.random.SeedSequence(seed).spawn(len(chunk_starts) + 1)
+
+    # Draw every timestamp up front, already sorted, and hand each chunk
+    # its own slice - the chunks come out in chronological order
+    timestamps = generate_timestamps(np.random.default_rng(ts_seed), start_date, end_date, num_sessions)
+    ts_chunks = [timestamps[i:i + SESSIONS_PER_CHUNK] for i in chunk_starts]
+
+    if len(ts_chunks) == 1:
+        # Small run: not worth starting worker processes
+        yield generate_session_chunk(ts_chunks[0], seeds[0], user_agent_pool)
+        return
+
+    workers = min(len(ts_chunks), os.cpu_count() or 1)
+    print(f"  Using {workers} worker processes for {len(ts_chunks)} chunks...")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map() hands results back in order, as soon as each one is ready
+        yield from executor.map(
+            generate_session_chunk, ts_chunks, seeds,
+            [user_agent_pool] * len(ts_chunks)
+        )
 
-        # Pick random values for this session
-        device_type = random.choices(DEVICE_TYPES, weights=DEVICE_WEIGHTS)[0]
-        network_type = random.choice(NETWORK_TYPES)
-        country = random.choice(COUNTRIES)
 
-        # Generate realistic session duration (people watch 5-120 minutes)
-        session_duration_sec = random.randint(300, 7200)  # 5 min to 2 hours
+def generate_telemetry_data(num_sessions=NUM_SESSIONS, seed=SEED):
+    """
+    This is the main function that creates all our fake streaming data!
 
-        # Generate metrics based on conditions
-        startup_time = generate_startup_time(device_type, network_type)
-        rebuffer_count, rebuffer_duration = generate_rebuffer_events(
-            network_type, session_duration_sec
-        )
-        bitrate, resolution = generate_bitrate(network_type)
-
-        # Calculate frames dropped (better devices drop fewer frames)
-        device_quality_factor = {
-            'smart_tv': 1.5,
-            'mobile': 1.0,
-            'web': 1.2,
-            'tablet': 1.0
-        }
-        frames_dropped = int(np.random.poisson(
-            rebuffer_count * 10 * device_quality_factor[device_type]
-        ))
-
-        # Create the session record (like a row in Excel)
-        session = {
-            'session_id': generate_session_id(),
-            'user_id': generate_user_id(),
-            'timestamp': generate_timestamp(start_date, end_date),
-            'device_type': device_type,
-            'os_version': fake.user_agent(),  # Fake but realistic OS info
-            'app_version': f'v{random.randint(15, 18)}.{random.randint(0, 9)}.{random.randint(0, 9)}',
-            'content_id': random.choice(CONTENT_IDS),
-
-            # Performance metrics
-            'startup_time_ms': startup_time,
-            'rebuffer_count': rebuffer_count,
-            'rebuffer_duration_ms': rebuffer_duration,
-            'bitrate_kbps': bitrate,
-            'resolution': resolution,
-            'frames_dropped': frames_dropped,
-            'session_duration_sec': session_duration_sec,
-
-            # Context
-            'network_type': network_type,
-            'country_code': country,
-            'isp': random.choice(ISPS),
-            'cdn_pop': f'{country}-{random.randint(1, 5)}'  # CDN location
-        }
-
-        sessions.append(session)
-
-    # Convert list of dictionaries to pandas DataFrame (table)
-    df = pd.DataFrame(sessions)
-
-    # Sort by timestamp (chronological order)
-    df = df.sort_values('timestamp').reset_index(drop=True)
+    Returns every session in one DataFrame. For very large runs use
+    write_telemetry_parquet(), which never holds more than one chunk.
+    """
+    print(f"🎬 Generating {num_sessions:,} stream viewing sessions...")
+
+    df = pd.concat(iter_telemetry_chunks(num_sessions, seed), ignore_index=True)
 
     print(f"\n✅ Generated {len(df):,} sessions!")
     print(f" Date range: {df['timestamp'].min()} to {df['timestamp'].max()}")
@@ -389,37 +520,78 @@ def generate_telemetry_data(num_sessions=NUM_SESSIONS):
     return df
 
 
+def write_telemetry_parquet(output_file, num_sessions=NUM_SESSIONS, seed=SEED):
+    """
+    Generate sessions chunk by chunk, add the bugs and time patterns,
+    and append each chunk to one Parquet file.
+
+    WHY STREAM?
+    Peak memory stays at one chunk (SESSIONS_PER_CHUNK rows), not the
+    whole dataset plus a copy, so 10M+ sessions fit on a laptop. Chunks
+    cover back-to-back time ranges, so sorting inside each chunk (done
+    by add_realistic_time_patterns) keeps the whole file in time order.
+
+    Returns the first chunk, for a quick look at the data.
+    """
+    print(f"🎬 Generating {num_sessions:,} stream viewing sessions...")
+
+    rng = np.random.default_rng(seed)
+    writer = None
+    first_chunk = None
+    rows_written = 0
+
+    try:
+        for chunk in iter_telemetry_chunks(num_sessions, seed):
+            # Inject some realistic bugs and add realistic time patterns!
+            chunk = inject_realistic_bugs(chunk, rng)
+            chunk = add_realistic_time_patterns(chunk, rng)
+
+            # After generating and enhancing data, validate it
+            validate_telemetry_data(chunk)
+
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(output_file, table.schema, compression='zstd')
+                first_chunk = chunk
+            writer.write_table(table)
+            rows_written += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    print(f"\n✅ Wrote {rows_written:,} sessions")
+
+    return first_chunk
+
+
 
 ###################################### RUN THE GENERATOR ######################################
 
 if __name__ == "__main__":
-    # Generate the data
-    telemetry_df = generate_telemetry_data()
-
-    # Save to CSV file
+    # Save to a Parquet file
     # set BASE_DIR to the dir of the project
     BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
     DATA_DIR = os.path.join(BASE_DIR, 'data')
-    output_file = os.path.join(DATA_DIR, 'streaming_telemetry.csv')
-
-    # ...but first, inject some realistic bugs and add realistic time patterns!
-    telemetry_df = inject_realistic_bugs(telemetry_df)
-    telemetry_df = add_realistic_time_patterns(telemetry_df)
-
-    # After generating and enhancing data, validate it
-    validate_telemetry_data(telemetry_df)
-
-    telemetry_df.to_csv(output_file, index=False)
+    output_file = os.path.join(DATA_DIR, 'streaming_telemetry.parquet')
+
+    # Generate, enhance, validate and save the data one chunk at a time.
+    # Saved as Parquet: a compressed, typed, column-by-column file.
+    # WHY NOT CSV? Writing CSV turns every value into text that the pipeline
+    # then has to parse back; Parquet keeps the numbers, timestamps and
+    # categories as they are, and is a fraction of the size on disk.
+    sample_df = write_telemetry_parquet(output_file)
     print(f"\n💾 Saved to '{output_file}'")
 
     # Show some sample data
     print("\n📋 Sample of generated data (first 5 rows):")
-    print(telemetry_df.head())
+    print(sample_df.head())
 
-    # Show some statistics
+    # Show some statistics (reading back only the columns we need)
+    stats_df = pd.read_parquet(
+        output_file, columns=['startup_time_ms', 'rebuffer_count', 'device_type', 'resolution']
+    )
     print("\n📈 Quick Statistics:")
-    print(f"  Average startup time: {telemetry_df['startup_time_ms'].mean():.0f} ms")
-    print(f"  Average rebuffer count: {telemetry_df['rebuffer_count'].mean():.2f}")
-    print(f"  Most common device: {telemetry_df['device_type'].mode()[0]}")
-    print(f"  Most common resolution: {telemetry_df['resolution'].mode()[0]}")
-
+    print(f"  Average startup time: {stats_df['startup_time_ms'].mean():.0f} ms")
+    print(f"  Average rebuffer count: {stats_df['rebuffer_count'].mean():.2f}")
+    print(f"  Most common device: {stats_df['device_type'].mode()[0]}")
+    print(f"  Most common resolution: {stats_df['resolution'].mode()[0]}")
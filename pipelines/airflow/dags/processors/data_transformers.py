@@ -1,12 +1,99 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# ============================================
+# COLUMN TYPES
+# ============================================
+# Smallest type that holds each measurement. Narrow columns mean every
+# pass over the data (math, filters, writing Parquet) moves fewer bytes.
+# Counts and durations are whole numbers, so they stay integers.
+INPUT_TYPES = {
+    'startup_time_ms': 'int32',
+    'rebuffer_count': 'int16',
+    'rebuffer_duration_ms': 'int32',
+    'bitrate_kbps': 'int32',
+    'frames_dropped': 'int16',
+    'session_duration_sec': 'int32'
+}
+
+# Derived scores are computed in float64 and only stored as float32
+# (plenty for 0-100 values kept to 2 decimals in the warehouse), after
+# every classification has used the full-precision value
+OUTPUT_TYPES = {
+    'rebuffer_ratio': 'float32',
+    'overall_qoe_score': 'float32'
+}
+
+
+# ============================================
+# LOOKUP TABLES
+# ============================================
+# Fixed labels per device / country. Built once at import; the transformer
+# applies them per category (a few values), never per row.
+
+# Device family grouping
+DEVICE_FAMILY_MAP = {
+    'smart_tv': 'TV',
+    'mobile': 'Mobile',
+    'tablet': 'Mobile',  # Group tablets with mobile
+    'web': 'Desktop'
+}
+
+# Screen size category (inferred from device)
+SCREEN_SIZE_MAP = {
+    'smart_tv': 'large',
+    'web': 'medium',
+    'tablet': 'medium',
+    'mobile': 'small'
+}
+
+# Region grouping
+REGION_MAP = {
+    'US': 'North America',
+    'MX': 'North America',
+    'BR': 'South America',
+    'GB': 'Europe',
+    'FR': 'Europe',
+    'DE': 'Europe',
+    'IN': 'Asia',
+    'JP': 'Asia',
+    'KR': 'Asia'
+}
+
+# Market maturity (how long our service has been established in that locale)
+MARKET_MATURITY_MAP = {
+    'US': 'mature',
+    'GB': 'mature',
+    'MX': 'growing',
+    'BR': 'growing',
+    'IN': 'emerging',
+    'FR': 'mature',
+    'DE': 'mature',
+    'JP': 'mature',
+    'KR': 'mature'
+}
+
+# Timezone grouping (for global analysis)
+TIMEZONE_MAP = {
+    'US': 'Americas',
+    'MX': 'Americas',
+    'BR': 'Americas',
+    'GB': 'EMEA',  # Europe, Middle East, Africa
+    'FR': 'EMEA',
+    'DE': 'EMEA',
+    'IN': 'APAC',  # Asia Pacific
+    'JP': 'APAC',
+    'KR': 'APAC'
+}
+
+
 class TelemetryTransformer:
     """
     Transforms raw telemetry into analytics-ready features.
@@ -16,21 +103,109 @@ class TelemetryTransformer:
     Transformed data = chopped, seasoned, ready to cook
     """
 
+    # ============================================
+    # THRESHOLD TABLES
+    # ============================================
+    # Every category below is a ladder of cut-offs on one number. Stored
+    # as sorted arrays, np.searchsorted finds each value's step for the
+    # whole column in one binary search: value >= THRESH[i] lands past i.
+    # (LABELS always has one more entry than THRESH.) The step number is
+    # used directly as a category code, so the text columns come out as
+    # pandas categories without ever building one string per row.
+
+    # Hour of day -> time of day ('night' wraps around midnight)
+    _HOUR_THRESH = np.array([6, 12, 17, 22])
+    _TIME_OF_DAY_LABELS = ['morning', 'afternoon', 'evening', 'night']
+    _HOUR_STEP_CODES = np.array([3, 0, 1, 2, 3], dtype=np.int8)  # step -> label position
+    _TIME_OF_DAY_CODE_BY_HOUR = _HOUR_STEP_CODES[np.searchsorted(_HOUR_THRESH, np.arange(24), side='right')]
+
+    # Bitrate (kbps) -> 0-100 quality score
+    _BITRATE_THRESH = np.array([1000, 3000, 6000, 20000])
+    _BITRATE_SCORES = np.array([10, 25, 50, 75, 100], dtype=np.int8)
+
+    # Startup time (ms) -> category
+    _STARTUP_THRESH = np.array([1000, 2000, 4000])
+    _STARTUP_LABELS = ['excellent', 'good', 'fair', 'poor']
+
+    # Overall QoE score -> session quality
+    _QOE_THRESH = np.array([40, 60, 80])
+    _QOE_LABELS = ['poor', 'fair', 'good', 'excellent']
+
+    # Session duration (minutes) -> viewing duration category
+    _DURATION_THRESH = np.array([10, 40])
+    _DURATION_LABELS = ['short', 'medium', 'long']
+
+    # Rebuffer count -> buffering severity (counts ABOVE 0, 2, 5 step up)
+    _BUFFERING_THRESH = np.array([0, 2, 5])
+    _BUFFERING_LABELS = ['none', 'minor', 'moderate', 'severe']
+
+    # Achieved bitrate (kbps) -> inferred network quality
+    _NETWORK_THRESH = np.array([2000, 5000, 10000])
+    _NETWORK_LABELS = ['poor', 'fair', 'good', 'excellent']
+
     def transform_all(self, df):
         """
         Apply all transformations to the dataset.
         """
         logger.info(f"🔧 Starting transformation of {len(df):,} records...")
 
-        df = self.add_time_features(df)
+        # Few distinct values -> store as category (small integer codes),
+        # so the lookups below work per category instead of per row
+        for col in ('device_type', 'country_code'):
+            df[col] = df[col].astype('category')
+
+        for col, dtype in INPUT_TYPES.items():
+            if col in df.columns:
+                df[col] = df[col].astype(dtype, copy=False)
+
+        # Time, device and geography features each read just one input
+        # column, so they run side by side in threads (pandas/NumPy release
+        # the GIL in their C loops). Each works on its own one-column frame
+        # and the new columns are copied back afterwards.
+        independent_steps = [
+            (self.add_time_features, 'timestamp'),
+            (self.add_device_categories, 'device_type'),
+            (self.add_geographic_features, 'country_code'),
+        ]
+        with ThreadPoolExecutor(max_workers=len(independent_steps)) as executor:
+            futures = [executor.submit(step, df[[column]].copy()) for step, column in independent_steps]
+            for future in futures:
+                features = future.result()
+                for column in features.columns:
+                    df[column] = features[column]
+
+        # Session classifications need the quality metrics: keep these in order
         df = self.calculate_quality_metrics(df)
         df = self.add_session_classifications(df)
-        df = self.add_device_categories(df)
-        df = self.add_geographic_features(df)
+
+        for col, dtype in OUTPUT_TYPES.items():
+            df[col] = df[col].astype(dtype)
 
         logger.info("✅ Transformation complete!")
         return df
 
+    @staticmethod
+    def _bucket(values, thresholds, labels, side='right'):
+        """
+        Label every value with the step of the threshold ladder it falls
+        in, as a category column (the step number is the category code).
+        """
+        return pd.Categorical.from_codes(np.searchsorted(thresholds, values, side=side), categories=labels)
+
+    @staticmethod
+    def _map_categories(series, mapping):
+        """
+        Like series.map(mapping) for a category column, but the dict is
+        only consulted once per category (4-9 values), not once per row.
+        Several categories may map to the same value; the result is a
+        category column too.
+        """
+        codes = series.cat.codes.to_numpy()
+        mapped = pd.Categorical(series.cat.categories.map(mapping))
+        return pd.Categorical.from_codes(
+            np.where(codes >= 0, mapped.codes[codes], -1), categories=mapped.categories
+        )
+
     def add_time_features(self, df):
         """
         Extract useful time-based features from timestamp.
@@ -46,34 +221,31 @@ class TelemetryTransformer:
         # Ensure timestamp is datetime
         df['timestamp'] = pd.to_datetime(df['timestamp'])
 
-        # Extract components
-        df['year'] = df['timestamp'].dt.year
-        df['month'] = df['timestamp'].dt.month
-        df['day'] = df['timestamp'].dt.day
-        df['hour'] = df['timestamp'].dt.hour
-        df['day_of_week'] = df['timestamp'].dt.dayofweek  # 0=Monday, 6=Sunday
-        df['day_name'] = df['timestamp'].dt.day_name()
+        # Extract components straight from the raw nanosecond values:
+        # whole days and hours since 1970 are plain integer divisions
+        # (1970-01-01 was a Thursday, so day 0 is weekday 3).
+        # Only the parts something downstream uses are kept, as 1-byte ints.
+        ns = df['timestamp'].to_numpy().astype('datetime64[ns]').view(np.int64)
+        days, ns_into_day = np.divmod(ns, 86_400 * 10**9)
+        hour = (ns_into_day // (3_600 * 10**9)).astype(np.int8)
+        day_of_week = ((days + 3) % 7).astype(np.int8)
+        df['hour'] = hour
+        df['day_of_week'] = day_of_week  # 0=Monday, 6=Sunday
 
         # Create time of day categories
-        def categorize_time_of_day(hour):
-            if 6 <= hour < 12:
-                return 'morning'
-            elif 12 <= hour < 17:
-                return 'afternoon'
-            elif 17 <= hour < 22:
-                return 'evening'
-            else:
-                return 'night'
-
-        df['time_of_day'] = df['hour'].apply(categorize_time_of_day)
+        # WHY A TABLE? .apply() would call a Python function once per row;
+        # with only 24 possible hours, the label for each is looked up directly
+        df['time_of_day'] = pd.Categorical.from_codes(
+            self._TIME_OF_DAY_CODE_BY_HOUR[hour], categories=self._TIME_OF_DAY_LABELS
+        )
 
         # Is it a weekend?
-        df['is_weekend'] = df['day_of_week'].isin([5, 6]).astype(int)
+        df['is_weekend'] = day_of_week >= 5
 
         # Is it peak viewing time? (7pm - 11pm)
-        df['is_peak_time'] = ((df['hour'] >= 19) & (df['hour'] <= 23)).astype(int)
+        df['is_peak_time'] = hour >= 19
 
-        logger.info(f"    ✅ Added {7} time-based features")
+        logger.info(f"    ✅ Added {5} time-based features")
         return df
 
     def calculate_quality_metrics(self, df):
@@ -84,13 +256,25 @@ class TelemetryTransformer:
         """
         logger.info("  Calculating quality metrics...")
 
+        # WHY WORK ON ARRAYS IN PLACE?
+        # Each pandas step (divide, fillna, clip, subtract, ...) makes a new
+        # full-length column and walks all rows again. Pulling the inputs out
+        # as NumPy arrays and updating a couple of buffers in place (out=)
+        # touches the same memory far fewer times and makes no temporaries.
+        rebuffer_ms = df['rebuffer_duration_ms'].to_numpy()
+        duration_sec = df['session_duration_sec'].to_numpy()
+        startup_ms = df['startup_time_ms'].to_numpy()
+        bitrate = df['bitrate_kbps'].to_numpy()
+
         # 1. Rebuffer Ratio
         # What percentage of the session was spent buffering?
         # Formula: (rebuffer_duration_ms / session_duration_sec * 1000) * 100
-        df['rebuffer_ratio'] = (
-            df['rebuffer_duration_ms'] / (df['session_duration_sec'] * 1000)
-        ) * 100
-        df['rebuffer_ratio'] = df['rebuffer_ratio'].fillna(0).clip(0, 100)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rebuffer_ratio = rebuffer_ms / (duration_sec * 1000.0)
+        rebuffer_ratio *= 100
+        rebuffer_ratio[np.isnan(rebuffer_ratio)] = 0
+        np.clip(rebuffer_ratio, 0, 100, out=rebuffer_ratio)
+        df['rebuffer_ratio'] = rebuffer_ratio
 
         # 2. Average Bitrate Quality Score
         # Convert bitrate to a 0-100 score
@@ -98,33 +282,17 @@ class TelemetryTransformer:
         # 720p (3000 kbps) = 50
         # 1080p (6000 kbps) = 75
         # 4K (20000+ kbps) = 100
-        def bitrate_to_score(bitrate):
-            if bitrate >= 20000:
-                return 100
-            elif bitrate >= 6000:
-                return 75
-            elif bitrate >= 3000:
-                return 50
-            elif bitrate >= 1000:
-                return 25
-            else:
-                return 10
-
-        df['quality_score'] = df['bitrate_kbps'].apply(bitrate_to_score)
+        quality_score = self._BITRATE_SCORES[
+            np.searchsorted(self._BITRATE_THRESH, bitrate, side='right')
+        ]
+        df['quality_score'] = quality_score
 
         # 3. Startup Performance Category
         # How fast did it start?
-        def categorize_startup(startup_ms):
-            if startup_ms < 1000:
-                return 'excellent'  # Under 1 second
-            elif startup_ms < 2000:
-                return 'good'       # 1-2 seconds
-            elif startup_ms < 4000:
-                return 'fair'       # 2-4 seconds
-            else:
-                return 'poor'       # Over 4 seconds
-
-        df['startup_category'] = df['startup_time_ms'].apply(categorize_startup)
+        # Under 1 second = excellent, 1-2s = good, 2-4s = fair, over 4s = poor
+        df['startup_category'] = self._bucket(
+            startup_ms, self._STARTUP_THRESH, self._STARTUP_LABELS
+        )
 
         # 4. Overall QoE Score (0-100)
         # Weighted combination of factors
@@ -132,21 +300,25 @@ class TelemetryTransformer:
         rebuffer_weight = 0.4
         quality_weight = 0.3
 
-        # Normalize startup time (lower is better, so invert)
-        startup_normalized = 100 - (df['startup_time_ms'] / 300)  # 30s = 0 score
-        startup_normalized = startup_normalized.clip(0, 100)
+        # Normalize startup time (lower is better, so invert): 30s = 0 score
+        qoe = startup_ms / 300
+        np.subtract(100, qoe, out=qoe)
+        np.clip(qoe, 0, 100, out=qoe)
+        qoe *= startup_weight
+
+        # The other two terms share ONE scratch buffer, so the whole score
+        # needs just two full-length arrays however many terms it has
 
         # Normalize rebuffering (lower is better, so invert)
-        rebuffer_normalized = 100 - df['rebuffer_ratio']
+        term = np.subtract(100, rebuffer_ratio)
+        term *= rebuffer_weight
+        qoe += term
 
         # Quality score already 0-100
-        quality_normalized = df['quality_score']
+        np.multiply(quality_score, quality_weight, out=term)
+        qoe += term
 
-        df['overall_qoe_score'] = (
-            startup_normalized * startup_weight +
-            rebuffer_normalized * rebuffer_weight +
-            quality_normalized * quality_weight
-        )
+        df['overall_qoe_score'] = qoe
 
         # 5. Video Start Failure Flag
         # Did the session fail to start?
@@ -168,59 +340,32 @@ class TelemetryTransformer:
         logger.info("  Adding session classifications...")
 
         # 1. Overall Session Quality
-        def classify_session_quality(score):
-            if score >= 80:
-                return 'excellent'
-            elif score >= 60:
-                return 'good'
-            elif score >= 40:
-                return 'fair'
-            else:
-                return 'poor'
-
-        df['session_quality'] = df['overall_qoe_score'].apply(classify_session_quality)
+        # (each one is a threshold-table lookup, not .apply per row)
+        df['session_quality'] = self._bucket(
+            df['overall_qoe_score'].to_numpy(), self._QOE_THRESH, self._QOE_LABELS
+        )
 
         # 2. Viewing Duration Category
         # Short: < 10 minutes (just browsing)
         # Medium: 10-40 minutes (single episode)
         # Long: > 40 minutes (movie or binge-watching)
-        def classify_duration(duration_sec):
-            duration_min = duration_sec / 60
-            if duration_min < 10:
-                return 'short'
-            elif duration_min < 40:
-                return 'medium'
-            else:
-                return 'long'
-
-        df['viewing_duration_category'] = df['session_duration_sec'].apply(classify_duration)
+        duration_min = df['session_duration_sec'].to_numpy() / 60
+        df['viewing_duration_category'] = self._bucket(
+            duration_min, self._DURATION_THRESH, self._DURATION_LABELS
+        )
 
         # 3. Buffering Severity
-        def classify_buffering(rebuffer_count):
-            if rebuffer_count == 0:
-                return 'none'
-            elif rebuffer_count <= 2:
-                return 'minor'
-            elif rebuffer_count <= 5:
-                return 'moderate'
-            else:
-                return 'severe'
-
-        df['buffering_severity'] = df['rebuffer_count'].apply(classify_buffering)
+        # 0 = none, 1-2 = minor, 3-5 = moderate, 6+ = severe
+        # (side='left': a count equal to a threshold stays in the lower step)
+        df['buffering_severity'] = self._bucket(
+            df['rebuffer_count'].to_numpy(), self._BUFFERING_THRESH, self._BUFFERING_LABELS, side='left'
+        )
 
         # 4. Network Quality Inference
         # Based on achieved bitrate, infer network quality
-        def infer_network_quality(bitrate):
-            if bitrate >= 10000:
-                return 'excellent'
-            elif bitrate >= 5000:
-                return 'good'
-            elif bitrate >= 2000:
-                return 'fair'
-            else:
-                return 'poor'
-
-        df['network_quality_inferred'] = df['bitrate_kbps'].apply(infer_network_quality)
+        df['network_quality_inferred'] = self._bucket(
+            df['bitrate_kbps'].to_numpy(), self._NETWORK_THRESH, self._NETWORK_LABELS
+        )
 
         logger.info(f"    ✅ Added {4} classification features")
         return df
@@ -232,24 +377,10 @@ class TelemetryTransformer:
         logger.info("  Adding device categories...")
 
         # Device family grouping
-        device_family_map = {
-            'smart_tv': 'TV',
-            'mobile': 'Mobile',
-            'tablet': 'Mobile',  # Group tablets with mobile
-            'web': 'Desktop'
-        }
-
-        df['device_family'] = df['device_type'].map(device_family_map)
+        df['device_family'] = self._map_categories(df['device_type'], DEVICE_FAMILY_MAP)
 
         # Screen size category (inferred from device)
-        screen_size_map = {
-            'smart_tv': 'large',
-            'web': 'medium',
-            'tablet': 'medium',
-            'mobile': 'small'
-        }
-
-        df['screen_size'] = df['device_type'].map(screen_size_map)
+        df['screen_size'] = self._map_categories(df['device_type'], SCREEN_SIZE_MAP)
 
         logger.info(f"    ✅ Added {2} device features")
         return df
@@ -261,50 +392,14 @@ class TelemetryTransformer:
         logger.info("  Adding geographic features...")
 
         # Region grouping
-        region_map = {
-            'US': 'North America',
-            'MX': 'North America',
-            'BR': 'South America',
-            'GB': 'Europe',
-            'FR': 'Europe',
-            'DE': 'Europe',
-            'IN': 'Asia',
-            'JP': 'Asia',
-            'KR': 'Asia'
-        }
-
-        df['region'] = df['country_code'].map(region_map)
+        df['region'] = self._map_categories(df['country_code'], REGION_MAP)
 
         # Market maturity (how long our service has been established in that locale)
         # Mature markets tend to have better infrastructure
-        market_maturity_map = {
-            'US': 'mature',
-            'GB': 'mature',
-            'MX': 'growing',
-            'BR': 'growing',
-            'IN': 'emerging',
-            'FR': 'mature',
-            'DE': 'mature',
-            'JP': 'mature',
-            'KR': 'mature'
-        }
-
-        df['market_maturity'] = df['country_code'].map(market_maturity_map)
+        df['market_maturity'] = self._map_categories(df['country_code'], MARKET_MATURITY_MAP)
 
         # Timezone grouping (for global analysis)
-        timezone_map = {
-            'US': 'Americas',
-            'MX': 'Americas',
-            'BR': 'Americas',
-            'GB': 'EMEA',  # Europe, Middle East, Africa
-            'FR': 'EMEA',
-            'DE': 'EMEA',
-            'IN': 'APAC',  # Asia Pacific
-            'JP': 'APAC',
-            'KR': 'APAC'
-        }
-
-        df['timezone_group'] = df['country_code'].map(timezone_map)
+        df['timezone_group'] = self._map_categories(df['country_code'], TIMEZONE_MAP)
 
         logger.info(f"    ✅ Added {3} geographic features")
         return df
@@ -313,7 +408,7 @@ class TelemetryTransformer:
 # Example usage
 if __name__ == "__main__":
     # Load cleaned data from validation step
-    df = pd.read_csv('../../../data/streaming_telemetry_clean.csv')
+    df = pd.read_parquet('../../../data/streaming_telemetry_clean.parquet')
 
     # Transform it
     transformer = TelemetryTransformer()
@@ -333,5 +428,5 @@ if __name__ == "__main__":
     print(transformed_df['session_quality'].value_counts(normalize=True).mul(100).round(1))
 
     # Save transformed data
-    transformed_df.to_csv('../../../data/streaming_telemetry_transformed.csv', index=False)
-    print("\n Saved transformed data to 'streaming_telemetry_transformed.csv'")
+    transformed_df.to_parquet('../../../data/streaming_telemetry_transformed.parquet', compression='snappy', index=False)
+    print("\n Saved transformed data to 'streaming_telemetry_transformed.parquet'")
@@ -3,6 +3,10 @@ from airflow.providers.standard.operators.python import PythonOperator
 from airflow.providers.standard.operators.bash import BashOperator
 from datetime import datetime, timedelta
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
 import logging
 import os
 
@@ -13,7 +17,7 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '
 PIPELINE_DIR = os.path.join(BASE_DIR, 'pipelines')
 if PIPELINE_DIR not in sys.path:
     sys.path.insert(0, PIPELINE_DIR)
-from processors.data_validators import TelemetryValidator
+from processors.data_validators import TelemetryValidator, DATA_QUALITY_SCORE_THRESHOLD
 from processors.data_transformers import TelemetryTransformer
 
 # ============================================
@@ -33,9 +37,112 @@ default_args = {
 
 # File paths
 DATA_DIR = os.path.join(BASE_DIR, 'data')
-RAW_DATA_FILE = f'{DATA_DIR}/streaming_telemetry.csv'
-CLEAN_DATA_FILE = f'{DATA_DIR}/streaming_telemetry_clean.csv'
-TRANSFORMED_DATA_FILE = f'{DATA_DIR}/streaming_telemetry_transformed.csv'
+RAW_DATA_FILE = f'{DATA_DIR}/streaming_telemetry.parquet'
+# Hand-offs between tasks are Parquet: no text parsing on read, and
+# timestamps/categories come back with their types intact
+TRANSFORMED_DATA_FILE = f'{DATA_DIR}/streaming_telemetry_transformed.parquet'
+
+# One JSON line per pipeline run, newest last (read by monitor_pipeline.py)
+REPORT_INDEX_FILE = f'{DATA_DIR}/quality_reports/index.jsonl'
+
+# Rows validated and transformed per block in task 2+3 (bounds its memory use)
+VALIDATION_CHUNK_ROWS = 200_000
+
+# Columns task 4 needs from the transformed data
+AGGREGATE_INPUT_COLUMNS = [
+    'timestamp', 'device_type', 'country_code', 'session_id',
+    'startup_time_ms', 'rebuffer_count', 'rebuffer_ratio',
+    'overall_qoe_score', 'bitrate_kbps', 'session_duration_sec'
+]
+
+
+def save_csv(df, path):
+    """
+    Write a DataFrame to CSV with Arrow's writer.
+
+    WHY NOT df.to_csv()? pandas formats every value in Python; Arrow
+    converts whole columns in multithreaded C++, several times faster,
+    and the file reads back the same with pd.read_csv().
+    """
+    pv.write_csv(pa.Table.from_pandas(df, preserve_index=False), path)
+
+
+def aggregate_daily(df):
+    """
+    Daily summary statistics per (date, device_type, country_code).
+
+    WHY NOT df.groupby().agg()? Each group is turned into ONE integer key
+    (day number, device code, country code packed together), so finding
+    the groups is a single np.unique, and every statistic is a weighted
+    np.bincount over all rows at once - no per-group Python work and no
+    pandas groupby at all (the median comes from one lexsort).
+    Rows with a missing key are dropped, as groupby does.
+    """
+    # Day number since 1970 as a plain integer (works for any stored time
+    # unit); dates are only turned back into date objects for the output
+    # rows, one per group
+    days = df['timestamp'].to_numpy().astype('datetime64[D]').view(np.int64)
+    device = df['device_type'].astype('category')
+    country = df['country_code'].astype('category')
+    device_codes = device.cat.codes.to_numpy().astype(np.int64)
+    country_codes = country.cat.codes.to_numpy().astype(np.int64)
+
+    keep = (device_codes >= 0) & (country_codes >= 0) & ~np.isnat(df['timestamp'].to_numpy())
+    key = (days << 16) | (device_codes << 8) | country_codes
+    groups, group_id = np.unique(key[keep], return_inverse=True)
+    n_groups = len(groups)
+
+    def column(name):
+        return df[name].to_numpy(dtype=np.float64)[keep]
+
+    def group_mean(values):
+        # Like pandas: missing values are skipped, not counted
+        ok = ~np.isnan(values)
+        return (np.bincount(group_id[ok], weights=values[ok], minlength=n_groups) /
+                np.bincount(group_id[ok], minlength=n_groups))
+
+    startup = column('startup_time_ms')
+    startup_mean = group_mean(startup)
+
+    # Sample standard deviation (ddof=1, like pandas) from squared
+    # distances to each group's mean - a second pass, but numerically safe
+    startup_ok = ~np.isnan(startup)
+    startup_n = np.bincount(group_id[startup_ok], minlength=n_groups)
+    startup_dev = startup[startup_ok] - startup_mean[group_id[startup_ok]]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        startup_std = np.sqrt(
+            np.bincount(group_id[startup_ok], weights=startup_dev ** 2, minlength=n_groups) / (startup_n - 1)
+        )
+    startup_std[startup_n < 2] = np.nan
+
+    # Medians need the values in order: sort once by (group, value), then
+    # every group is a contiguous run and its median sits in the middle
+    ok_group = group_id[startup_ok]
+    ordered = startup[startup_ok][np.lexsort((startup[startup_ok], ok_group))]
+    run_start = np.cumsum(startup_n) - startup_n
+    has_values = startup_n > 0
+    low = (run_start + (startup_n - 1) // 2)[has_values]
+    high = (run_start + startup_n // 2)[has_values]
+    startup_median = np.full(n_groups, np.nan)
+    startup_median[has_values] = (ordered[low] + ordered[high]) / 2
+
+    return pd.DataFrame({
+        'date': (groups >> 16).astype('datetime64[D]').astype(object),
+        'device_type': pd.Categorical.from_codes((groups >> 8) & 0xFF, dtype=device.dtype),
+        'country_code': pd.Categorical.from_codes(groups & 0xFF, dtype=country.dtype),
+        'session_count': np.bincount(group_id, weights=df['session_id'].notna().to_numpy()[keep],
+                                     minlength=n_groups).astype(np.int64),
+        'avg_startup_ms': startup_mean,
+        'median_startup_ms': startup_median,
+        'std_startup_ms': startup_std,
+        'avg_rebuffer_count': group_mean(column('rebuffer_count')),
+        'avg_rebuffer_ratio': group_mean(column('rebuffer_ratio')),
+        'avg_qoe_score': group_mean(column('overall_qoe_score')),
+        'avg_bitrate_kbps': group_mean(column('bitrate_kbps')),
+        'total_watch_time_sec': np.bincount(group_id, weights=np.nan_to_num(column('session_duration_sec')),
+                                            minlength=n_groups).round().astype(np.int64)
+    })
+
 
 # ============================================
 # TASK FUNCTIONS
@@ -56,77 +163,117 @@ def task_1_ingest_data(**context):
     if not os.path.exists(RAW_DATA_FILE):
         raise FileNotFoundError(f"Raw data file not found: {RAW_DATA_FILE}")
 
-    # Load data to check it
-    df = pd.read_csv(RAW_DATA_FILE)
+    # Check the file: Parquet stores the row count in its footer,
+    # so there is no need to read the data itself here
+    record_count = pq.ParquetFile(RAW_DATA_FILE).metadata.num_rows
 
-    logging.info(f"✅ Successfully loaded {len(df):,} raw records")
+    logging.info(f"✅ Found {record_count:,} raw records (from the file footer)")
 
     # Push metadata to XCom (Airflow's way of sharing data between tasks)
-    context['ti'].xcom_push(key='raw_record_count', value=len(df))
+    context['ti'].xcom_push(key='raw_record_count', value=record_count)
 
-    return len(df)
+    return record_count
 
 
-def task_2_validate_data(**context):
+def task_23_validate_and_transform(**context):
     """
-    Task 2: Validate and clean data.
+    Tasks 2+3: Validate, clean, transform and enrich data in one pass.
 
     This is CRITICAL - bad data in = bad insights out!
-    """
-    logging.info("🔍 Task 2: Validating data...")
-
-    # Load raw data
-    df = pd.read_csv(RAW_DATA_FILE)
 
-    # Validate
-    validator = TelemetryValidator()
-    is_valid, clean_df, report = validator.validate_all(df)
-
-    # Store quality metrics
-    context['ti'].xcom_push(key='quality_score', value=report['data_quality_score'])
-    context['ti'].xcom_push(key='clean_record_count', value=len(clean_df))
+    WHY ONE TASK? Validation and transformation both work row by row, so
+    each block can be cleaned and enriched straight away. Running them as
+    two tasks meant writing the whole clean dataset to disk only for the
+    next task to read it all back.
+    """
+    logging.info("🔍 Task 2+3: Validating and transforming data...")
+
+    # Validate and transform the raw file one block of rows at a time,
+    # appending each finished block to the output, so memory holds one
+    # block - not the whole dataset twice. This is the only read of the
+    # raw file and there is no intermediate clean file.
+    # Rows go to a temporary file that only replaces TRANSFORMED_DATA_FILE
+    # once the overall quality score passes.
+    raw_file = pq.ParquetFile(RAW_DATA_FILE)
+    tmp_file = f'{TRANSFORMED_DATA_FILE}.tmp'
+    transformer = TelemetryTransformer()
+    writer = None
+    raw_count = clean_count = 0
+    feature_count = 0
+    weighted_score = 0.0
+    seen_ids = np.empty(0, dtype=np.uint64)  # sorted hashes of every session_id kept so far
+
+    try:
+        for batch in raw_file.iter_batches(batch_size=VALIDATION_CHUNK_ROWS):
+            chunk = batch.to_pandas()
+
+            # A fresh validator per block: its score is a percentage of that block
+            validator = TelemetryValidator()
+            _, clean_chunk, report = validator.validate_all(chunk)
+
+            # The validator drops duplicates within the block; a copy of a
+            # session kept in ANY earlier block is dropped here. Sessions are
+            # remembered as 8-byte hashes in one sorted array (not a set of
+            # strings), looked up with a binary search
+            ids = pd.util.hash_array(clean_chunk['session_id'].to_numpy())
+            pos = np.searchsorted(seen_ids, ids).clip(max=max(len(seen_ids) - 1, 0))
+            repeat = (seen_ids[pos] == ids) if len(seen_ids) else np.zeros(len(ids), dtype=bool)
+            if repeat.any():
+                clean_chunk = clean_chunk[~repeat]
+                ids = ids[~repeat]
+
+            # Two sorted runs back to back: the stable sort just merges them
+            seen_ids = np.concatenate([seen_ids, np.sort(ids)])
+            seen_ids.sort(kind='stable')
+
+            # Overall score = average of block scores, weighted by block size
+            raw_count += len(chunk)
+            clean_count += len(clean_chunk)
+            weighted_score += report['data_quality_score'] * len(chunk)
+
+            if not len(clean_chunk):
+                continue
+
+            # Every transform step only looks at its own row, so enriching
+            # block by block gives the same rows as enriching everything at once.
+            # transform_all adds columns to the frame it gets, so it gets its
+            # own (shallow) frame rather than a filtered view of the block
+            transformed_chunk = transformer.transform_all(clean_chunk.copy(deep=False))
+            feature_count = len(transformed_chunk.columns)
+
+            table = pa.Table.from_pandas(transformed_chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_file, table.schema, compression='snappy')
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+    quality_score = round(weighted_score / raw_count, 2) if raw_count else 0.0
+    is_valid = quality_score >= DATA_QUALITY_SCORE_THRESHOLD
+
+    # Store quality and transformation metrics
+    ti = context['ti']
+    ti.xcom_push(key='quality_score', value=quality_score)
+    ti.xcom_push(key='clean_record_count', value=clean_count)
+    ti.xcom_push(key='transformed_record_count', value=clean_count)
+    ti.xcom_push(key='feature_count', value=feature_count)
 
     if not is_valid:
         # Quality score too low - fail the pipeline!
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
         raise ValueError(
-            f"Data quality score {report['data_quality_score']}% is below threshold (95%)"
+            f"Data quality score {quality_score}% is below threshold ({DATA_QUALITY_SCORE_THRESHOLD}%)"
         )
 
-    # Save cleaned data
-    clean_df.to_csv(CLEAN_DATA_FILE, index=False)
-
-    logging.info(f"✅ Validation passed! Quality score: {report['data_quality_score']}%")
-    logging.info(f"✅ Saved {len(clean_df):,} clean records")
-
-    return report['data_quality_score']
-
-
-def task_3_transform_data(**context):
-    """
-    Task 3: Transform and enrich data.
-
-    Add all the calculated metrics and categories.
-    """
-    logging.info("🔧 Task 3: Transforming data...")
-
-    # Load clean data
-    df = pd.read_csv(CLEAN_DATA_FILE)
-
-    # Transform
-    transformer = TelemetryTransformer()
-    transformed_df = transformer.transform_all(df)
-
     # Save transformed data
-    transformed_df.to_csv(TRANSFORMED_DATA_FILE, index=False)
-
-    # Push metrics
-    context['ti'].xcom_push(key='transformed_record_count', value=len(transformed_df))
-    context['ti'].xcom_push(key='feature_count', value=len(transformed_df.columns))
+    os.replace(tmp_file, TRANSFORMED_DATA_FILE)
 
-    logging.info(f"✅ Transformation complete!")
-    logging.info(f"✅ Created {len(transformed_df.columns)} features")
+    logging.info(f"✅ Validation passed! Quality score: {quality_score}%")
+    logging.info(f"✅ Transformed {clean_count:,} clean records into {feature_count} features")
 
-    return len(transformed_df)
+    return quality_score
 
 
 def task_4_calculate_aggregates(**context):
@@ -140,36 +287,17 @@ def task_4_calculate_aggregates(**context):
     """
     logging.info("📊 Task 4: Calculating aggregates...")
 
-    # Load transformed data
-    df = pd.read_csv(TRANSFORMED_DATA_FILE, parse_dates=['timestamp'])
-
-    # Add date column for grouping
-    df['date'] = df['timestamp'].dt.date
+    # Load transformed data - only the columns the aggregates use.
+    # Parquet stores each column separately, so the other ~30 columns are
+    # never read from disk, and the types come from the file (no guessing)
+    df = pd.read_parquet(TRANSFORMED_DATA_FILE, engine='pyarrow', columns=AGGREGATE_INPUT_COLUMNS)
 
     # Aggregate by date, device, country
-    aggregates = df.groupby(['date', 'device_type', 'country_code']).agg({
-        'session_id': 'count',  # Number of sessions
-        'startup_time_ms': ['mean', 'median', 'std'],  # Startup stats
-        'rebuffer_count': 'mean',  # Average rebuffers
-        'rebuffer_ratio': 'mean',  # Average rebuffer %
-        'overall_qoe_score': 'mean',  # Average QoE
-        'bitrate_kbps': 'mean',  # Average bitrate
-        'session_duration_sec': 'sum'  # Total watch time
-    }).reset_index()
-
-    # Flatten column names
-    aggregates.columns = [
-        'date', 'device_type', 'country_code',
-        'session_count',
-        'avg_startup_ms', 'median_startup_ms', 'std_startup_ms',
-        'avg_rebuffer_count', 'avg_rebuffer_ratio',
-        'avg_qoe_score', 'avg_bitrate_kbps',
-        'total_watch_time_sec'
-    ]
+    aggregates = aggregate_daily(df)
 
     # Save aggregates
     agg_file = f'{DATA_DIR}/streaming_qoe_daily_aggregates.csv'
-    aggregates.to_csv(agg_file, index=False)
+    save_csv(aggregates, agg_file)
 
     logging.info(f"✅ Created {len(aggregates):,} aggregate rows")
 
@@ -189,17 +317,25 @@ def task_5_data_quality_report(**context):
     # Pull metrics from previous tasks
     ti = context['ti']
     raw_count = ti.xcom_pull(task_ids='ingest_data', key='raw_record_count')
-    clean_count = ti.xcom_pull(task_ids='validate_data', key='clean_record_count')
-    quality_score = ti.xcom_pull(task_ids='validate_data', key='quality_score')
-    transformed_count = ti.xcom_pull(task_ids='transform_data', key='transformed_record_count')
-    feature_count = ti.xcom_pull(task_ids='transform_data', key='feature_count')
+    clean_count = ti.xcom_pull(task_ids='validate_and_transform', key='clean_record_count')
+    quality_score = ti.xcom_pull(task_ids='validate_and_transform', key='quality_score')
+    transformed_count = ti.xcom_pull(task_ids='validate_and_transform', key='transformed_record_count')
+    feature_count = ti.xcom_pull(task_ids='validate_and_transform', key='feature_count')
 
     # Calculate metrics
     data_loss_pct = ((raw_count - clean_count) / raw_count * 100) if raw_count else 0
 
     # Create report
+    # One clock reading for the whole report, plus the run's logical date
+    # (the data interval Airflow is processing). The file is named after
+    # the logical date, so re-running or backfilling a day overwrites that
+    # day's report instead of adding a second one.
+    run_time = datetime.now()
+    logical_date = context.get('logical_date') or run_time
+
     report = {
-        'pipeline_run_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'pipeline_run_date': run_time.strftime('%Y-%m-%d %H:%M:%S'),
+        'logical_date': logical_date.strftime('%Y-%m-%d %H:%M:%S'),
         'raw_records': raw_count,
         'clean_records': clean_count,
         'records_dropped': raw_count - clean_count,
@@ -210,13 +346,18 @@ def task_5_data_quality_report(**context):
     }
 
     # Save report
-    report_file = f'{DATA_DIR}/quality_reports/report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
+    report_file = f'{DATA_DIR}/quality_reports/report_{logical_date.strftime("%Y%m%d_%H%M%S")}.json'
 
     import json
     os.makedirs(os.path.dirname(report_file), exist_ok=True)
     with open(report_file, 'w') as f:
         json.dump(report, f, indent=2)
 
+    # Also append one line to the reports index, so the monitor can read
+    # the latest runs from the end of one file instead of opening them all
+    with open(REPORT_INDEX_FILE, 'a') as f:
+        f.write(json.dumps(report) + '\n')
+
     logging.info(f"✅ Quality report saved to {report_file}")
     logging.info(f"\n📊 PIPELINE SUMMARY:")
     logging.info(f"  Raw Records: {raw_count:,}")
@@ -271,17 +412,10 @@ ingest_task = PythonOperator(
     dag=dag,
 )
 
-# Task 2: Validate
-validate_task = PythonOperator(
-    task_id='validate_data',
-    python_callable=task_2_validate_data,
-    dag=dag,
-)
-
-# Task 3: Transform
-transform_task = PythonOperator(
-    task_id='transform_data',
-    python_callable=task_3_transform_data,
+# Task 2+3: Validate and transform
+validate_transform_task = PythonOperator(
+    task_id='validate_and_transform',
+    python_callable=task_23_validate_and_transform,
     dag=dag,
 )
 
@@ -311,11 +445,11 @@ notify_task = PythonOperator(
 # ============================================
 
 # This defines the order tasks run in:
-# ingest → validate → transform → aggregate → quality_report → notify
+# ingest → validate+transform → aggregate → quality_report → notify
 #
 # Using >> means "run this, THEN run that"
 
-ingest_task >> validate_task >> transform_task >> aggregate_task >> quality_report_task >> notify_task
+ingest_task >> validate_transform_task >> aggregate_task >> quality_report_task >> notify_task
 
 # Visual representation of the flow:
 #
@@ -326,10 +460,6 @@ ingest_task >> validate_task >> transform_task >> aggregate_task >> quality_repo
 #          ▼
 #     ┌─────────┐
 #     │Validate │
-#     └────┬────┘
-#          │
-#          ▼
-#     ┌─────────┐
 #     │Transform│
 #     └────┬────┘
 #          │
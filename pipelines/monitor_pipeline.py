@@ -1,5 +1,6 @@
 import pandas as pd
 import json
+import mmap
 from datetime import datetime, timedelta
 import os
 
@@ -14,27 +15,18 @@ class PipelineMonitor:
         BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
         REPORT_DIR = os.path.join(BASE_DIR, 'data')
         self.reports_dir = os.path.join(REPORT_DIR, reports_dir)
+        self.index_file = os.path.join(self.reports_dir, 'index.jsonl')
 
     def check_recent_runs(self, hours=24):
         """Check if pipeline has run successfully in last N hours."""
         cutoff_time = datetime.now() - timedelta(hours=hours)
 
         # Find recent reports
-        recent_reports = []
-
-        for filename in os.listdir(self.reports_dir):
-            if filename.endswith('.json'):
-                filepath = os.path.join(self.reports_dir, filename)
-                with open(filepath, 'r') as f:
-                    report = json.load(f)
-
-                report_time = datetime.strptime(
-                    report['pipeline_run_date'],
-                    '%Y-%m-%d %H:%M:%S'
-                )
-
-                if report_time > cutoff_time:
-                    recent_reports.append(report)
+        if os.path.exists(self.index_file):
+            recent_reports = self.read_recent_reports(cutoff_time)
+        else:
+            # No index yet (reports from before it existed): scan the folder
+            recent_reports = self.scan_report_files(cutoff_time)
 
         if not recent_reports:
             self.send_alert(f"⚠️ No pipeline runs in last {hours} hours!")
@@ -56,6 +48,59 @@ class PipelineMonitor:
         print(f"✅ Pipeline healthy: {len(recent_reports)} successful runs in last {hours}h")
         return True
 
+    def read_recent_reports(self, cutoff_time):
+        """
+        Read the reports newer than cutoff_time from the reports index.
+
+        WHY READ BACKWARDS?
+        The index gets one line per run, oldest first. Walking it from the
+        end and stopping at the first report older than the cutoff means
+        each check only parses the last few runs, however long the history.
+        """
+        recent_reports = []
+
+        if os.path.getsize(self.index_file) == 0:
+            return recent_reports
+
+        with open(self.index_file, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as index:
+            end = len(index)
+            while end > 0:
+                start = index.rfind(b'\n', 0, end - 1) + 1
+                line = index[start:end].strip()
+                end = start
+
+                if not line:
+                    continue
+
+                report = json.loads(line)
+                if self.report_time(report) <= cutoff_time:
+                    break
+                recent_reports.append(report)
+
+        return recent_reports
+
+    def scan_report_files(self, cutoff_time):
+        """Open every report file in the folder (slow; fallback only)."""
+        recent_reports = []
+
+        for filename in os.listdir(self.reports_dir):
+            if filename.endswith('.json'):
+                filepath = os.path.join(self.reports_dir, filename)
+                with open(filepath, 'r') as f:
+                    report = json.load(f)
+
+                if self.report_time(report) > cutoff_time:
+                    recent_reports.append(report)
+
+        return recent_reports
+
+    @staticmethod
+    def report_time(report):
+        # 'YYYY-MM-DD HH:MM:SS' is ISO 8601, so the C-level fromisoformat
+        # parses it without strptime's format-string matching
+        return datetime.fromisoformat(report['pipeline_run_date'])
+
     def send_alert(self, message):
         """Send alert (placeholder - would use Slack/email in production)."""
         print(f"\n🚨 ALERT: {message}")
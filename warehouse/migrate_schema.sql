@@ -0,0 +1,138 @@
+-- ============================================
+-- SCHEMA MIGRATION (existing warehouses)
+-- ============================================
+-- schema_design.sql only runs when the database volume is first created
+-- (docker-entrypoint-initdb.d). A warehouse created before the BRIN index,
+-- materialized views and hourly rollup were added needs this script.
+--
+-- Idempotent: every statement is IF [NOT] EXISTS / ON CONFLICT, so it is
+-- safe to run more than once (and against a fresh schema, where it does
+-- nothing but re-sync the rollup).
+--
+-- Usage:
+--   docker exec -i streaming_analytics psql -U analytics_user -d streaming_analytics < warehouse/migrate_schema.sql
+
+BEGIN;
+
+-- ============================================
+-- INDEXES
+-- ============================================
+
+-- Timestamp index: BRIN replaces the btree (see schema_design.sql)
+DROP INDEX IF EXISTS idx_fact_timestamp;
+CREATE INDEX IF NOT EXISTS idx_fact_timestamp_brin ON fact_playback_sessions
+    USING BRIN (session_timestamp) WITH (pages_per_range = 32);
+
+-- ============================================
+-- MATERIALIZED VIEWS
+-- ============================================
+-- Same definitions as schema_design.sql. Created WITH DATA, so each view
+-- is populated from the existing facts right away.
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_fact_sessions_wide AS
+SELECT
+    f.session_key,
+    f.session_timestamp,
+    f.overall_qoe_score,
+    f.startup_time_ms,
+    f.rebuffer_count,
+    f.rebuffer_ratio,
+    f.session_quality,
+    d.full_date,
+    d.day_name,
+    dev.device_type,
+    dev.device_family,
+    g.country_code,
+    g.region
+FROM fact_playback_sessions f
+JOIN dim_date d ON f.date_key = d.date_key
+JOIN dim_device dev ON f.device_key = dev.device_key
+JOIN dim_geography g ON f.geo_key = g.geo_key;
+
+-- REFRESH ... CONCURRENTLY needs a unique index
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_wide_session ON mv_fact_sessions_wide(session_key);
+CREATE INDEX IF NOT EXISTS idx_mv_wide_timestamp ON mv_fact_sessions_wide(session_timestamp);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_hour_device_qoe AS
+SELECT
+    d.full_date,
+    t.hour,
+    dev.device_type,
+    COUNT(f.overall_qoe_score) AS sessions,  -- Sessions with a score
+    SUM(f.overall_qoe_score) AS sum_qoe
+FROM fact_playback_sessions f
+JOIN dim_date d ON f.date_key = d.date_key
+JOIN dim_time t ON f.time_key = t.time_key
+JOIN dim_device dev ON f.device_key = dev.device_key
+GROUP BY d.full_date, t.hour, dev.device_type;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_hour_device ON mv_hour_device_qoe(full_date, hour, device_type);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_daily_stats AS
+SELECT
+    d.full_date,
+    d.is_weekend,
+    COUNT(*) AS sessions,
+    COUNT(f.session_duration_sec) AS watched_sessions,  -- Sessions with a duration
+    SUM(f.session_duration_sec) AS sum_duration_sec,
+    COUNT(f.overall_qoe_score) AS scored_sessions,  -- Sessions with a score
+    SUM(f.overall_qoe_score) AS sum_qoe
+FROM fact_playback_sessions f
+JOIN dim_date d ON f.date_key = d.date_key
+GROUP BY d.full_date, d.is_weekend;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_daily_stats ON mv_daily_stats(full_date);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_content_daily AS
+SELECT
+    f.session_timestamp::DATE AS session_date,
+    c.content_type,
+    c.genre,
+    COUNT(*) AS sessions,
+    COUNT(f.overall_qoe_score) AS scored_sessions,  -- Sessions with a score
+    SUM(f.overall_qoe_score) AS sum_qoe,
+    COUNT(f.session_duration_sec) AS watched_sessions,  -- Sessions with a duration
+    SUM(f.session_duration_sec) AS sum_duration_sec
+FROM fact_playback_sessions f
+JOIN dim_content c ON f.content_key = c.content_key
+GROUP BY f.session_timestamp::DATE, c.content_type, c.genre;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_content_daily ON mv_content_daily(session_date, content_type, genre);
+
+-- ============================================
+-- ROLLUP TABLES
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS fact_hourly_rollup (
+    hour TIMESTAMP PRIMARY KEY,  -- Start of the hour
+    sessions BIGINT NOT NULL,
+    poor_sessions BIGINT NOT NULL,  -- session_quality = 'poor'
+    sum_qoe DOUBLE PRECISION,
+    sum_startup_ms BIGINT,
+    sum_rebuffer_ratio DOUBLE PRECISION
+);
+
+-- Backfill every hour already in the fact table
+-- WHY: load_fact_data.py only recomputes the hours each new load touches,
+-- so facts loaded before the rollup existed would never appear in it
+INSERT INTO fact_hourly_rollup (
+    hour, sessions, poor_sessions,
+    sum_qoe, sum_startup_ms, sum_rebuffer_ratio
+)
+SELECT
+    DATE_TRUNC('hour', session_timestamp),
+    COUNT(*),
+    COUNT(*) FILTER (WHERE session_quality = 'poor'),
+    SUM(overall_qoe_score),
+    SUM(startup_time_ms),
+    SUM(rebuffer_ratio)
+FROM fact_playback_sessions
+GROUP BY DATE_TRUNC('hour', session_timestamp)
+ON CONFLICT (hour) DO UPDATE SET
+    sessions = EXCLUDED.sessions,
+    poor_sessions = EXCLUDED.poor_sessions,
+    sum_qoe = EXCLUDED.sum_qoe,
+    sum_startup_ms = EXCLUDED.sum_startup_ms,
+    sum_rebuffer_ratio = EXCLUDED.sum_rebuffer_ratio;
+
+COMMIT;
@@ -256,7 +256,13 @@ CREATE TABLE fact_playback_sessions (
 
 -- Date indexes (most queries filter by date)
 CREATE INDEX idx_fact_date ON fact_playback_sessions(date_key);
-CREATE INDEX idx_fact_timestamp ON fact_playback_sessions(session_timestamp);
+
+-- Timestamp index: BRIN instead of btree
+-- WHY: Sessions arrive in time order, so each block of the table covers a
+-- narrow time range. BRIN stores just min/max per 32 pages - a tiny index
+-- that still skips every block outside "last 7 days"
+CREATE INDEX idx_fact_timestamp_brin ON fact_playback_sessions
+    USING BRIN (session_timestamp) WITH (pages_per_range = 32);
 
 -- Device indexes (analyze by device type)
 CREATE INDEX idx_fact_device ON fact_playback_sessions(device_key);
@@ -341,6 +347,116 @@ JOIN dim_time t ON f.time_key = t.time_key
 GROUP BY t.hour, t.time_of_day, t.is_peak_time
 ORDER BY t.hour;
 
+-- ============================================
+-- MATERIALIZED VIEWS (Pre-joined for dashboards)
+-- ============================================
+-- A materialized view is a view whose result is STORED like a table.
+-- WHY: Dashboards only need a handful of dimension attributes
+-- (device_type, country_code, region...). Copying them onto each fact row
+-- once means every dashboard query scans ONE table instead of joining.
+-- Refreshed after every fact load (see warehouse/load_fact_data.py)
+
+-- Wide sessions: the fact columns and dimension attributes dashboards use
+-- (listed explicitly: no f.*, so the view stays narrow as the fact grows)
+CREATE MATERIALIZED VIEW mv_fact_sessions_wide AS
+SELECT
+    f.session_key,
+    f.session_timestamp,
+    f.overall_qoe_score,
+    f.startup_time_ms,
+    f.rebuffer_count,
+    f.rebuffer_ratio,
+    f.session_quality,
+    d.full_date,
+    d.day_name,
+    dev.device_type,
+    dev.device_family,
+    g.country_code,
+    g.region
+FROM fact_playback_sessions f
+JOIN dim_date d ON f.date_key = d.date_key
+JOIN dim_device dev ON f.device_key = dev.device_key
+JOIN dim_geography g ON f.geo_key = g.geo_key;
+
+-- REFRESH ... CONCURRENTLY needs a unique index
+CREATE UNIQUE INDEX idx_mv_wide_session ON mv_fact_sessions_wide(session_key);
+CREATE INDEX idx_mv_wide_timestamp ON mv_fact_sessions_wide(session_timestamp);
+
+-- Hour-of-day x device QoE per day (engineering heatmap)
+-- WHY: The heatmap is ~24 x 6 cells but used to re-aggregate 7 days of
+-- sessions on every page view. Keeping one row per day lets the page
+-- pick any number of recent days and still average exactly.
+CREATE MATERIALIZED VIEW mv_hour_device_qoe AS
+SELECT
+    d.full_date,
+    t.hour,
+    dev.device_type,
+    COUNT(f.overall_qoe_score) AS sessions,  -- Sessions with a score
+    SUM(f.overall_qoe_score) AS sum_qoe
+FROM fact_playback_sessions f
+JOIN dim_date d ON f.date_key = d.date_key
+JOIN dim_time t ON f.time_key = t.time_key
+JOIN dim_device dev ON f.device_key = dev.device_key
+GROUP BY d.full_date, t.hour, dev.device_type;
+
+CREATE UNIQUE INDEX idx_mv_hour_device ON mv_hour_device_qoe(full_date, hour, device_type);
+
+-- Daily engagement totals (product page weekend vs weekday)
+-- WHY: Weekend/weekday comparisons only need one row per day. Sums and
+-- counts (not averages) let the page combine any range of days exactly.
+CREATE MATERIALIZED VIEW mv_daily_stats AS
+SELECT
+    d.full_date,
+    d.is_weekend,
+    COUNT(*) AS sessions,
+    COUNT(f.session_duration_sec) AS watched_sessions,  -- Sessions with a duration
+    SUM(f.session_duration_sec) AS sum_duration_sec,
+    COUNT(f.overall_qoe_score) AS scored_sessions,  -- Sessions with a score
+    SUM(f.overall_qoe_score) AS sum_qoe
+FROM fact_playback_sessions f
+JOIN dim_date d ON f.date_key = d.date_key
+GROUP BY d.full_date, d.is_weekend;
+
+CREATE UNIQUE INDEX idx_mv_daily_stats ON mv_daily_stats(full_date);
+
+-- Daily content engagement (product page content treemap)
+-- WHY: The treemap groups a whole 7-90 day window by content type and
+-- genre. Summing ~N_days x N_genres rows keeps that cost flat no matter
+-- how many sessions the window holds.
+CREATE MATERIALIZED VIEW mv_content_daily AS
+SELECT
+    f.session_timestamp::DATE AS session_date,
+    c.content_type,
+    c.genre,
+    COUNT(*) AS sessions,
+    COUNT(f.overall_qoe_score) AS scored_sessions,  -- Sessions with a score
+    SUM(f.overall_qoe_score) AS sum_qoe,
+    COUNT(f.session_duration_sec) AS watched_sessions,  -- Sessions with a duration
+    SUM(f.session_duration_sec) AS sum_duration_sec
+FROM fact_playback_sessions f
+JOIN dim_content c ON f.content_key = c.content_key
+GROUP BY f.session_timestamp::DATE, c.content_type, c.genre;
+
+CREATE UNIQUE INDEX idx_mv_content_daily ON mv_content_daily(session_date, content_type, genre);
+
+-- ============================================
+-- ROLLUP TABLES (Pre-aggregated by hour)
+-- ============================================
+-- One row per hour instead of one per session.
+-- WHY: Trend charts only need hourly/daily numbers. Storing SUMs (not
+-- averages) means any range of hours can be combined exactly:
+--     avg = SUM(sum_qoe) / SUM(sessions)
+-- Kept up to date after every fact load (see warehouse/load_fact_data.py)
+
+CREATE TABLE fact_hourly_rollup (
+    hour TIMESTAMP PRIMARY KEY,  -- Start of the hour
+    sessions BIGINT NOT NULL,
+    poor_sessions BIGINT NOT NULL,  -- session_quality = 'poor'
+    sum_qoe DOUBLE PRECISION,
+    sum_startup_ms BIGINT,
+    sum_rebuffer_ratio DOUBLE PRECISION
+);
+
 -- ============================================
 -- COMMENTS (Documentation)
 -- ============================================